@@ -0,0 +1,290 @@
+"""
+Classroom analytics over answer history logs (see answer_history.py).
+
+    python analytics.py                        # default history folder
+    python analytics.py --log-dir /share/quiz  # a whole lab's logs
+    python analytics.py --json                 # machine-readable summary
+
+Logs are read in one streaming pass, a line at a time, so memory does not
+grow with the size of the logs.  The running totals (the rollup) are saved
+next to the logs together with how far into each file they got; the next
+run picks up from those offsets and only reads events written since.
+
+The report covers per-state accuracy and response time for every state in
+states_capitals, the capitals most often given for the wrong state, each
+student's totals with their own per-state record (asked, correct and the
+wrong answers they gave), and accuracy per day.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+from answer_history import default_log_dir
+from state_data import states_capitals
+
+ROLLUP_FILE = "rollup.json"
+ROLLUP_VERSION = 2
+MAX_WRONG_ANSWERS = 40   # distinct wrong answers kept per state
+MAX_STUDENT_WRONG = 5    # ... and per student per state
+STUDENT_WEAKEST = 3      # states listed under each student in the text report
+
+_decode = json.JSONDecoder().decode
+_day_span = [0.0, 0.0, None]   # [start ts, end ts, "YYYY-MM-DD"] of the last local day seen
+
+
+def empty_rollup():
+    return {
+        "version": ROLLUP_VERSION,
+        "files": {},      # log file name -> bytes already counted
+        "events": 0,
+        "states": {
+            state: {"asked": 0, "correct": 0, "total_ms": 0, "timed": 0, "wrong": {}}
+            for state in states_capitals
+        },
+        "students": {},   # name -> totals, plus "states": state -> {asked, correct, wrong}
+        "days": {},       # "YYYY-MM-DD" -> [asked, correct]
+    }
+
+
+def load_rollup(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            rollup = json.load(f)
+    except (OSError, ValueError):
+        return empty_rollup()
+    if rollup.get("version") != ROLLUP_VERSION:
+        return empty_rollup()
+    return rollup
+
+
+def save_rollup(rollup, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(rollup, f)
+    os.replace(tmp, path)
+
+
+def _trim(counts, keep):
+    """Drop the rarest entries so a per-state tally can't grow without bound."""
+    if len(counts) > keep * 2:
+        for key, _ in sorted(counts.items(), key=lambda kv: kv[1])[:len(counts) - keep]:
+            del counts[key]
+
+
+def _day(ts):
+    """
+    Local calendar day of a timestamp.  The span of the last day seen (local
+    midnight to local midnight, so any UTC offset and DST are right) is
+    cached; each log is in time order, so datetime is only called per day.
+    """
+    start, end, name = _day_span
+    if start <= ts < end:
+        return name
+    local = datetime.fromtimestamp(ts)
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    name = local.strftime("%Y-%m-%d")
+    _day_span[:] = midnight.timestamp(), (midnight + timedelta(days=1)).timestamp(), name
+    return name
+
+
+def add_event(rollup, event):
+    """Fold one answer event into the running totals."""
+    state = event.get("state")
+    stats = rollup["states"].get(state)
+    if stats is None:
+        return  # not a state in this question bank
+    correct = bool(event.get("correct"))
+    answer = "" if correct else (event.get("answer") or "").strip()
+
+    rollup["events"] += 1
+    stats["asked"] += 1
+    if correct:
+        stats["correct"] += 1
+    elif answer:
+        stats["wrong"][answer] = stats["wrong"].get(answer, 0) + 1
+        _trim(stats["wrong"], MAX_WRONG_ANSWERS)
+    if event.get("response_ms") is not None:
+        stats["total_ms"] += event["response_ms"]
+        stats["timed"] += 1
+
+    ts = event.get("ts", 0)
+    student = rollup["students"].setdefault(
+        event.get("student", "?"),
+        {"asked": 0, "correct": 0, "first_ts": ts, "last_ts": ts, "last_session": None, "sessions": 0,
+         "states": {}},
+    )
+    student["asked"] += 1
+    student["correct"] += correct
+    mine = student["states"].setdefault(state, {"asked": 0, "correct": 0, "wrong": {}})
+    mine["asked"] += 1
+    mine["correct"] += correct
+    if answer:
+        mine["wrong"][answer] = mine["wrong"].get(answer, 0) + 1
+        _trim(mine["wrong"], MAX_STUDENT_WRONG)
+    student["first_ts"] = min(student["first_ts"], ts)
+    student["last_ts"] = max(student["last_ts"], ts)
+    if event.get("session") != student["last_session"]:
+        student["last_session"] = event.get("session")
+        student["sessions"] += 1
+
+    totals = rollup["days"].setdefault(_day(ts), [0, 0])
+    totals[0] += 1
+    totals[1] += correct
+
+
+def update(rollup, log_dir):
+    """
+    Read only the bytes appended to each log since the last run.
+    Returns the number of new events.
+    """
+    before = rollup["events"]
+    for path in sorted(glob.glob(os.path.join(log_dir, "*.jsonl"))):
+        name = os.path.basename(path)
+        offset = rollup["files"].get(name, 0)
+        if os.path.getsize(path) < offset:
+            # A log was truncated or replaced; start over from scratch
+            print(f"{name} shrank since the last run; rebuilding the rollup", file=sys.stderr)
+            rollup.clear()
+            rollup.update(empty_rollup())
+            return update(rollup, log_dir)
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a write still in progress; pick it up next time
+                offset += len(line)
+                try:
+                    add_event(rollup, _decode(line.decode("utf-8")))
+                except ValueError:
+                    continue  # skip a corrupt line rather than abort
+        rollup["files"][name] = offset
+    return rollup["events"] - before
+
+
+# ---------- Reports ----------
+
+def _student_states(states):
+    """One student's per-state record, weakest first."""
+    rows = [
+        {
+            "state": state,
+            "asked": s["asked"],
+            "correct": s["correct"],
+            "accuracy": s["correct"] / s["asked"],
+            "confused": [
+                {"answer": answer, "count": count}
+                for answer, count in sorted(s["wrong"].items(), key=lambda kv: -kv[1])
+            ],
+        }
+        for state, s in states.items()
+    ]
+    rows.sort(key=lambda r: (r["accuracy"], -r["asked"], r["state"]))
+    return rows
+
+
+def summarize(rollup, top=10):
+    states = []
+    for state, s in rollup["states"].items():
+        states.append({
+            "state": state,
+            "capital": states_capitals[state],
+            "asked": s["asked"],
+            "accuracy": s["correct"] / s["asked"] if s["asked"] else None,
+            "avg_ms": s["total_ms"] / s["timed"] if s["timed"] else None,
+        })
+
+    confused = []
+    for state, s in rollup["states"].items():
+        for answer, count in s["wrong"].items():
+            confused.append({"state": state, "answer": answer, "count": count})
+    confused.sort(key=lambda c: -c["count"])
+
+    students = [
+        {
+            "student": name,
+            "asked": s["asked"],
+            "accuracy": s["correct"] / s["asked"] if s["asked"] else None,
+            "sessions": s["sessions"],
+            "last_seen": datetime.fromtimestamp(s["last_ts"]).strftime("%Y-%m-%d %H:%M"),
+            "states": _student_states(s["states"]),
+        }
+        for name, s in sorted(rollup["students"].items())
+    ]
+
+    days = [
+        {"day": day, "asked": asked, "accuracy": correct / asked}
+        for day, (asked, correct) in sorted(rollup["days"].items())
+    ]
+    return {
+        "events": rollup["events"],
+        "states": states,
+        "confused": confused[:top],
+        "students": students,
+        "days": days,
+    }
+
+
+def _pct(value):
+    return "   -" if value is None else f"{value * 100:3.0f}%"
+
+
+def print_report(summary, top=10):
+    print(f"{summary['events']} answers recorded\n")
+
+    print("Hardest states")
+    ranked = sorted(
+        (s for s in summary["states"] if s["asked"]),
+        key=lambda s: (s["accuracy"], -s["asked"])
+    )
+    for s in ranked[:top]:
+        avg = f"{s['avg_ms'] / 1000:5.1f}s" if s["avg_ms"] is not None else "    -"
+        print(f"  {s['state']:<16} {s['capital']:<16} {_pct(s['accuracy'])}  {avg}  ({s['asked']} asked)")
+    never = [s["state"] for s in summary["states"] if not s["asked"]]
+    if never:
+        print(f"  Never asked: {', '.join(never)}")
+
+    print("\nMost confused capitals")
+    for c in summary["confused"]:
+        print(f"  {c['answer']!r} for {c['state']} ({states_capitals[c['state']]}): {c['count']}x")
+
+    print("\nStudents")
+    for s in summary["students"]:
+        print(f"  {s['student']:<20} {_pct(s['accuracy'])}  {s['asked']:6d} answers  "
+              f"{s['sessions']:3d} sessions  last seen {s['last_seen']}")
+        weakest = [w for w in s["states"] if w["correct"] < w["asked"]][:STUDENT_WEAKEST]
+        for w in weakest:
+            confused = ", ".join(repr(c["answer"]) for c in w["confused"][:3])
+            print(f"      {w['state']:<16} {w['correct']}/{w['asked']}"
+                  + (f"  said {confused}" if confused else ""))
+
+    print("\nProgress by day")
+    for d in summary["days"]:
+        print(f"  {d['day']}  {_pct(d['accuracy'])}  {d['asked']:6d} answers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize answer history logs.")
+    parser.add_argument("--log-dir", default=default_log_dir())
+    parser.add_argument("--rollup", help=f"rollup file (default: <log-dir>/{ROLLUP_FILE})")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the saved rollup")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    rollup_path = args.rollup or os.path.join(args.log_dir, ROLLUP_FILE)
+    rollup = empty_rollup() if args.rebuild else load_rollup(rollup_path)
+    new_events = update(rollup, args.log_dir)
+    if os.path.isdir(args.log_dir):
+        save_rollup(rollup, rollup_path)
+
+    summary = summarize(rollup, args.top)
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"({new_events} new since the last run)")
+        print_report(summary, args.top)
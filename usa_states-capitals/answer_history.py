@@ -0,0 +1,109 @@
+"""
+Persistent answer history.
+
+Every graded answer becomes one JSON line in an append-only log:
+
+    {"ts": 1760000000.123, "student": "ana", "session": "3f2a...",
+     "state": "Ohio", "answer": "Columbus", "correct": true,
+     "verdict": "exact", "response_ms": 2140}
+
+AnswerLog.record() only puts the event on a queue, so the Tk thread never
+waits on the disk.  A background writer thread collects events for up to
+flush_interval seconds and appends the whole batch in one write, so a lab
+full of machines logging continuously only costs each of them one small
+append per interval.
+
+Each student gets their own file under the log directory, so many machines
+can write to a shared folder without interleaving lines.
+"""
+import getpass
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+
+_STOP = object()
+
+
+def default_log_dir():
+    return os.path.join(os.path.expanduser("~"), ".state-capitals-quiz", "history")
+
+
+def default_student():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "student"
+
+
+class AnswerLog:
+    def __init__(self, log_dir=None, student=None, flush_interval=0.5, max_batch=500):
+        self.log_dir = log_dir or default_log_dir()
+        self.student = student or default_student()
+        self.session = uuid.uuid4().hex
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        safe_name = re.sub(r"[^\w.-]+", "_", self.student)
+        self.path = os.path.join(self.log_dir, f"{safe_name}.jsonl")
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="answer-log", daemon=True)
+        self._writer.start()
+
+    def record(self, state, answer, correct, verdict=None, response_ms=None):
+        """Queue one answer event; never blocks on disk I/O."""
+        self._queue.put({
+            "ts": round(time.time(), 3),
+            "student": self.student,
+            "session": self.session,
+            "state": state,
+            "answer": answer,
+            "correct": bool(correct),
+            "verdict": verdict,
+            "response_ms": None if response_ms is None else round(response_ms),
+        })
+
+    def close(self, timeout=2.0):
+        """Flush everything still queued and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+
+    # ---------- Writer thread ----------
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+
+            # Keep collecting for up to flush_interval so one write covers
+            # everything that arrives in that window
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.max_batch or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        lines = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in batch)
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            print(f"Could not save answer history: {e}")
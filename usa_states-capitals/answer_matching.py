@@ -0,0 +1,172 @@
+"""
+Typo-tolerant answer matching.
+
+Typed answers are normalized before comparison: case, accents,
+punctuation and repeated whitespace are ignored, and common abbreviations
+are expanded ("St." -> "saint", "Ft." -> "fort", "Mt." -> "mount").  An
+answer that still differs is accepted as "close enough" when it is within
+a small edit distance of the expected one.
+
+AnswerIndex normalizes every answer in the bank once, up front.  Grading
+then normalizes only the typed text and runs a Levenshtein distance that
+stops as soon as the distance is known to exceed the allowed bound, so a
+grade costs a few microseconds whether the bank holds 50 entries or
+thousands.
+
+A prompt may also accept several answers (a tuple, e.g. every state whose
+bird is the Northern cardinal); each prompt's accepted answers are kept as
+a set, so grading is a set-membership check either way.
+"""
+import re
+import unicodedata
+
+EXACT = "exact"
+CLOSE = "close"
+WRONG = "wrong"
+
+ABBREVIATIONS = {
+    "st": "saint",
+    "ste": "sainte",
+    "ft": "fort",
+    "mt": "mount",
+}
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text):
+    """Fold case, accents, punctuation, whitespace and abbreviations."""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    words = _NON_WORD.sub(" ", text.lower()).split()
+    return " ".join(ABBREVIATIONS.get(word, word) for word in words)
+
+
+def allowed_distance(length):
+    """How many typos to forgive for an answer of this length."""
+    if length <= 4:
+        return 0
+    if length <= 8:
+        return 1
+    return 2
+
+
+def bounded_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, or limit + 1 as soon as it is
+    certain the distance is larger than limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    # Shared prefixes and suffixes never add to the distance; trimming them
+    # leaves only the few characters around the typo for the DP below.
+    start = 0
+    shortest = min(len(a), len(b))
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    tail = 0
+    while tail < shortest - start and a[-1 - tail] == b[-1 - tail]:
+        tail += 1
+    a = a[start:len(a) - tail]
+    b = b[start:len(b) - tail]
+
+    if len(a) > len(b):
+        a, b = b, a
+
+    previous = list(range(len(a) + 1))
+    for j, cb in enumerate(b, 1):
+        current = [j]
+        best = j
+        for i, ca in enumerate(a, 1):
+            cost = previous[i - 1] + (ca != cb)
+            if previous[i] + 1 < cost:
+                cost = previous[i] + 1
+            if current[i - 1] + 1 < cost:
+                cost = current[i - 1] + 1
+            current.append(cost)
+            if cost < best:
+                best = cost
+        if best > limit:
+            return limit + 1  # every path already costs too much
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+class MatchResult:
+    def __init__(self, verdict, expected, distance=0, matches_other=()):
+        self.verdict = verdict              # EXACT, CLOSE or WRONG
+        self.expected = expected            # the canonical answer
+        self.distance = distance            # edit distance after normalizing
+        self.matches_other = matches_other  # prompts whose answer was typed
+
+    @property
+    def accepted(self):
+        return self.verdict != WRONG
+
+    def __repr__(self):
+        return f"MatchResult({self.verdict!r}, {self.expected!r}, distance={self.distance})"
+
+
+def answers_of(answer):
+    """The accepted answers of an item as a tuple (one, or several)."""
+    return answer if isinstance(answer, tuple) else (answer,)
+
+
+class AnswerIndex:
+    def __init__(self, items, bank=None):
+        """
+        items: mapping of prompt (state) -> canonical answer (capital), or
+        -> tuple of canonical answers when several are right
+        bank:  optional QuestionBank whose answers() items is; its prebuilt
+               answer index then replaces the one built here, so opening a
+               large bank doesn't normalize every answer up front
+        """
+        self.items = items
+        self.bank = bank
+        self._accepted = {}     # prompt -> {normalized answer: canonical answer}, filled as asked
+        self._by_answer = None  # normalized answer -> tuple of prompts, without a bank
+
+        if bank is None:
+            self._by_answer = {}
+            for prompt, answer in items.items():
+                for key in self._accepted_for(prompt):
+                    self._by_answer[key] = self._by_answer.get(key, ()) + (prompt,)
+
+    def _accepted_for(self, prompt):
+        accepted = self._accepted.get(prompt)
+        if accepted is None:
+            accepted = self._accepted[prompt] = {
+                normalize(canonical): canonical for canonical in answers_of(self.items[prompt])
+            }
+        return accepted
+
+    def _prompts_answered_by(self, guess):
+        if self.bank is not None:
+            return tuple(self.bank.prompts_for_answer(guess))
+        return self._by_answer.get(guess, ())
+
+    def grade(self, prompt, typed):
+        """Grade a typed answer for prompt as EXACT, CLOSE or WRONG."""
+        expected = self.items[prompt]
+        accepted = self._accepted_for(prompt)
+        guess = normalize(typed)
+
+        if guess in accepted:
+            return MatchResult(EXACT, accepted[guess])
+
+        # Another prompt's answer is never "close enough" (Columbia vs Columbus)
+        others = self._prompts_answered_by(guess) if guess else ()
+        if others:
+            return MatchResult(WRONG, expected, matches_other=others)
+
+        if guess:
+            for key, canonical in accepted.items():
+                limit = allowed_distance(len(key))
+                if limit:
+                    distance = bounded_distance(guess, key, limit)
+                    if distance <= limit:
+                        return MatchResult(CLOSE, canonical, distance)
+
+        return MatchResult(WRONG, expected)
@@ -0,0 +1,155 @@
+"""
+Per-keystroke autocomplete for the capital Entry.
+
+PrefixTrie is built once from the answer names (the 50 capitals, or any
+loaded question bank).  Every trie node keeps its own short list of the
+first few completions, so a lookup walks len(prefix) nodes and returns a
+ready-made list, with no subtree search per keystroke.  Names are also
+reachable from the start of each word ("paul" finds "Saint Paul").
+
+AutocompleteDropdown attaches a Listbox under a tk.Entry.  Keystrokes only
+(re)arm an `after` timer, so a burst of typing costs one lookup once the
+typing pauses and never stalls the Tk event loop.
+"""
+import tkinter as tk
+
+from answer_matching import normalize
+
+
+class PrefixTrie:
+    def __init__(self, names, limit=8):
+        """
+        names: iterable of display strings
+        limit: completions kept per node (and returned per lookup)
+        """
+        self.limit = limit
+        self._root = {}   # char -> child node; "" -> completions for this prefix
+
+        # Sorted insertion means each node's list holds the first names
+        # alphabetically, with no sorting needed at lookup time.
+        for name in sorted(set(names), key=normalize):
+            key = normalize(name)
+            starts = [0] + [i + 1 for i, ch in enumerate(key) if ch == " "]
+            for start in starts:
+                self._insert(key[start:], name)
+
+    def _insert(self, key, name):
+        node = self._root
+        for ch in key:
+            node = node.setdefault(ch, {"": []})
+            top = node[""]
+            if len(top) < self.limit and name not in top:
+                top.append(name)
+
+    def complete(self, prefix):
+        """Return up to `limit` names matching prefix (case/punctuation-insensitive)."""
+        key = normalize(prefix)
+        if not key:
+            return []
+        node = self._root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return list(node[""])
+
+
+class AutocompleteDropdown:
+    def __init__(self, entry, trie, debounce_ms=60, min_chars=2):
+        self.entry = entry
+        self.trie = trie
+        self.debounce_ms = debounce_ms
+        self.min_chars = min_chars
+        self._after_id = None
+        self._shown_for = None
+
+        self.listbox = tk.Listbox(
+            entry.winfo_toplevel(),
+            font=entry["font"],
+            height=6,
+            activestyle="dotbox",
+            exportselection=False
+        )
+
+        entry.bind("<KeyRelease>", self._on_key, add="+")
+        entry.bind("<Down>", self._focus_list, add="+")
+        entry.bind("<Escape>", lambda event: self.hide(), add="+")
+        entry.bind("<FocusOut>", lambda event: self._schedule_hide(), add="+")
+        self.listbox.bind("<Return>", self._accept)
+        self.listbox.bind("<ButtonRelease-1>", self._accept)
+        self.listbox.bind("<Escape>", lambda event: (self.hide(), entry.focus_set()))
+
+    # ---------- Debounced lookup ----------
+
+    def _on_key(self, event):
+        if event.keysym in ("Down", "Up", "Return", "Escape", "Tab"):
+            return
+        if self._after_id is not None:
+            self.entry.after_cancel(self._after_id)
+        self._after_id = self.entry.after(self.debounce_ms, self.refresh)
+
+    def refresh(self):
+        """Look up the current text and show or hide the dropdown."""
+        self._after_id = None
+        text = self.entry.get()
+        if len(text.strip()) < self.min_chars:
+            self.hide()
+            return
+        if text == self._shown_for:
+            return  # nothing changed since the last lookup
+
+        matches = self.trie.complete(text)
+        if not matches or matches == [text]:
+            self.hide()
+            return
+
+        self._shown_for = text
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *matches)
+        self.listbox.config(height=len(matches))
+
+        top = self.entry.winfo_toplevel()
+        x = self.entry.winfo_rootx() - top.winfo_rootx()
+        y = self.entry.winfo_rooty() - top.winfo_rooty() + self.entry.winfo_height()
+        self.listbox.place(x=x, y=y, width=self.entry.winfo_width())
+        self.listbox.lift()
+
+    def hide(self):
+        self._shown_for = None
+        self.listbox.place_forget()
+
+    def cancel(self):
+        """Drop any pending lookup and hide (e.g. when a new question starts)."""
+        if self._after_id is not None:
+            self.entry.after_cancel(self._after_id)
+            self._after_id = None
+        self.hide()
+
+    def _schedule_hide(self):
+        # Give a click on the list a chance to land before hiding it
+        self.entry.after(150, self._hide_unless_focused)
+
+    def _hide_unless_focused(self):
+        if self.entry.focus_get() is not self.listbox:
+            self.hide()
+
+    # ---------- Picking a suggestion ----------
+
+    def _focus_list(self, event):
+        if not self.listbox.winfo_ismapped():
+            return None
+        self.listbox.focus_set()
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(0)
+        self.listbox.activate(0)
+        return "break"
+
+    def _accept(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.entry.delete(0, tk.END)
+            self.entry.insert(0, self.listbox.get(selection[0]))
+        self.hide()
+        self.entry.focus_set()
+        self.entry.icursor(tk.END)
+        return "break"
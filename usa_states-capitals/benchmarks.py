@@ -0,0 +1,368 @@
+"""
+Benchmarks for the quiz's hot paths.
+
+    python benchmarks.py --save before.json
+    ... change something ...
+    python benchmarks.py --baseline before.json --save after.json
+
+Every benchmark runs a fixed, seeded workload: after one untimed warm-up
+batch it is timed in batches big enough to last ~0.2 s, seven times over,
+and the median time per call is reported (the minimum is saved too).
+Results go to JSON together with the Python version, platform and git
+commit, so runs can be compared across commits.  With --baseline, any
+benchmark whose minimum is more than --threshold (default 25%) slower than
+the baseline's is reported as a regression; the minimum is the least
+noisy figure a busy machine gives.  Baseline benchmarks missing from the
+current run (dropped, renamed or skipped) are reported too.  A suspected
+regression is measured again, up to three more times with twice the
+repeats, and fails only if it stays slower; only the suspects are re-run,
+on the workloads (and Tk display) already set up.  Either failure makes the
+script exit with status 1.
+
+Canvas benchmarks need a Tk display.  Without one, an Xvfb virtual
+framebuffer is started if Xvfb is installed; otherwise those benchmarks
+are listed as skipped.  Performance changes to either GUI script should
+come with before/after numbers from here.
+"""
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+import label_layout
+from answer_matching import AnswerIndex
+from distractors import distractor_table
+from fireworks import FireworksRenderer
+from map_hit import DotLookup
+from quiz_engine import QuizEngine
+from scheduler import LeitnerScheduler
+from state_data import offsets, state_positions, states_capitals
+
+RESULTS_VERSION = 1
+REPEAT = 7
+DEFAULT_THRESHOLD = 0.25
+CONFIRM_RUNS = 3         # extra measurements of a suspected regression before failing
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(func, repeat=REPEAT):
+    """Median and minimum seconds per call of func()."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()     # calls per batch so a batch takes >= 0.2 s
+    timer.timeit(number)              # warm-up: caches, lazy tables, CPU clocks
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "median_us": statistics.median(runs) * 1_000_000,
+        "min_us": min(runs) * 1_000_000,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+# ---------- Headless workloads ----------
+
+def engine_benchmarks():
+    # Each workload has its own generator, so what it does never depends
+    # on how many calls earlier benchmarks happened to make
+    engine = QuizEngine(states_capitals, retire_correct=False, rng=random.Random(0))
+    yield "engine.next_question", engine.next_question
+
+    rng = random.Random(1)
+
+    def spaced_engine():
+        return QuizEngine(
+            states_capitals, retire_correct=False, rng=rng,
+            scheduler=LeitnerScheduler(states_capitals, rng=rng)
+        )
+    spaced = [spaced_engine()]
+
+    def spaced_round():
+        state = spaced[0].next_question()
+        if state is None:
+            spaced[0] = spaced_engine()   # everything mastered: start a new learner
+            state = spaced[0].next_question()
+        spaced[0].check_answer(states_capitals[state] if rng.random() < 0.7 else "Springfield")
+    yield "engine.spaced_question_and_answer", spaced_round
+
+    def answer_round():
+        state = engine.next_question()
+        engine.check_answer(states_capitals[state])
+    yield "engine.check_answer", answer_round
+
+    index = AnswerIndex(states_capitals)
+    yield "match.exact", lambda: index.grade("Massachusetts", "boston")
+    yield "match.typo", lambda: index.grade("Massachusetts", "Bostin")
+    yield "match.other_capital", lambda: index.grade("Massachusetts", "Hartford")
+    yield "match.wrong", lambda: index.grade("Massachusetts", "Cambridge Heights")
+
+    dots = {
+        state: (x + offsets.get(state, (0, 0))[0], y + offsets.get(state, (0, 0))[1])
+        for state, (x, y) in state_positions.items()
+    }
+
+    anchors = dict(dots)   # label anchors as the map solves them: nudged dots
+    extents = {state: (7 * len(capital), 14) for state, capital in states_capitals.items()}
+
+    def layout():
+        label_layout._cache.clear()
+        label_layout.solve_layout(anchors, extents, 940, 680)
+    yield "labels.solve_layout", layout
+
+    table = distractor_table(states_capitals, state_positions)
+    choices_rng = random.Random(2)
+    yield "choices.distractors", lambda: table.choices("Ohio", rng=choices_rng)
+
+    lookup = DotLookup(dots, 940, 680)
+    points_rng = random.Random(3)
+    points = [(points_rng.random() * 940, points_rng.random() * 680) for _ in range(1000)]
+    point = itertools.cycle(points).__next__
+    yield "click.dot_lookup", lambda: lookup.at(*point())
+
+
+# ---------- Canvas workloads ----------
+
+def open_display():
+    """
+    A hidden Tk root, starting Xvfb first if there is no display.
+    Returns (root, xvfb_process or None, reason-if-unavailable).
+    """
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        return root, None, None
+    except tk.TclError as e:
+        reason = f"no display ({e})"
+
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None, None, reason + "; Xvfb not installed"
+    display = f":{90 + os.getpid() % 100}"
+    proc = subprocess.Popen(
+        [xvfb, display, "-screen", "0", "1600x1000x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    os.environ["DISPLAY"] = display
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            root = tk.Tk()
+            root.withdraw()
+            return root, proc, None
+        except tk.TclError:
+            time.sleep(0.1)
+    proc.terminate()
+    return None, None, reason + "; Xvfb did not start"
+
+
+def _load_script(filename, module_name):
+    """Import one of the GUI scripts (their file names aren't importable)."""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def canvas_benchmarks(root):
+    import tkinter as tk
+
+    map_gui = _load_script("usa_states-capitals.py", "map_quiz")
+    map_quiz = map_gui.StateCapitalQuiz(tk.Toplevel(root))
+    root.update()
+
+    def create_labels():
+        map_quiz.map_canvas.delete("capital")
+        map_quiz.capital_labels = {}
+        map_quiz._create_capital_labels()
+        map_quiz.map_canvas.update_idletasks()
+    yield "map_gui.create_capital_labels", create_labels
+
+    def study_toggle():
+        map_quiz.toggle_study_mode()
+        map_quiz._cancel_reveal()
+        map_quiz.toggle_study_mode()
+        map_quiz.map_canvas.update_idletasks()
+    yield "map_gui.study_mode_toggle", study_toggle
+
+    def map_next():
+        map_quiz.next_question()
+        root.update_idletasks()
+    yield "map_gui.next_question", map_next
+
+    simple_gui = _load_script("us_state_capitals_tk.py", "simple_quiz")
+    simple_quiz = simple_gui.StateCapitalQuiz(tk.Toplevel(root))
+
+    def simple_next():
+        simple_quiz.next_question()
+        root.update_idletasks()
+    yield "simple_gui.next_question", simple_next
+
+    window = tk.Toplevel(root)
+    canvas = tk.Canvas(window, width=400, height=220)
+    canvas.pack()
+    fireworks = FireworksRenderer(canvas, rng=random.Random(0))
+
+    def fireworks_frame():
+        fireworks.draw_frame()
+        canvas.update_idletasks()
+    yield "fireworks.draw_frame", fireworks_frame
+
+
+# ---------- Running and comparing ----------
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(selected=None, baseline=None, threshold=DEFAULT_THRESHOLD):
+    """
+    Run the benchmarks (those starting with a name in selected, or all).
+    With a baseline, suspected regressions are confirmed before the
+    workloads and the Tk display are torn down.
+    """
+    current = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+        "skipped": {},
+    }
+    results = current["results"]
+    funcs = {}
+
+    def collect(benchmarks):
+        for name, func in benchmarks:
+            if selected and not any(name.startswith(prefix) for prefix in selected):
+                continue
+            funcs[name] = func
+            results[name] = measure(func)
+            print(f"{name:40s} {results[name]['median_us']:10.2f} us")
+
+    collect(engine_benchmarks())
+
+    root, xvfb, reason = open_display()
+    try:
+        if root is None:
+            for name in ("map_gui.*", "simple_gui.*", "fireworks.*"):
+                current["skipped"][name] = reason
+            print(f"canvas benchmarks skipped: {reason}")
+        else:
+            collect(canvas_benchmarks(root))
+        if baseline is not None:
+            confirm(current, baseline, threshold, funcs)
+    finally:
+        if root is not None:
+            root.destroy()
+        if xvfb is not None:
+            xvfb.terminate()
+    return current
+
+
+def _change(current, baseline, name):
+    """Fractional change in minimum time, or None if the baseline lacks name."""
+    old = baseline.get("results", {}).get(name)
+    if old is None:
+        return None
+    return current["results"][name]["min_us"] / old["min_us"] - 1
+
+
+def slower(current, baseline, threshold):
+    """Names whose minimum time got more than threshold slower."""
+    return [
+        name for name in current["results"]
+        if (_change(current, baseline, name) or 0) > threshold
+    ]
+
+
+def confirm(current, baseline, threshold, funcs, runs=CONFIRM_RUNS):
+    """
+    Re-measure apparent regressions up to `runs` more times, keeping each
+    benchmark's best result, so one noisy measurement can't fail the gate.
+    funcs maps benchmark names to the callables run() measured.
+    """
+    suspects = slower(current, baseline, threshold)
+    for _ in range(runs):
+        if not suspects:
+            break
+        print(f"re-measuring {len(suspects)} possible regression(s)")
+        for name in suspects:
+            result = measure(funcs[name], 2 * REPEAT)
+            if result["min_us"] < current["results"][name]["min_us"]:
+                current["results"][name] = result
+        suspects = slower(current, baseline, threshold)
+
+
+def compare(current, baseline, threshold, selected=None):
+    """
+    Print the change in minimum time per benchmark; return the names that
+    regressed or that the baseline has but this run doesn't.
+    """
+    failures = []
+    print(f"\nvs baseline {baseline.get('commit') or '?'} (threshold +{threshold:.0%}, min times)")
+    for name, result in current["results"].items():
+        change = _change(current, baseline, name)
+        if change is None:
+            print(f"  {name:40s} new")
+            continue
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            failures.append(name)
+        old = baseline["results"][name]
+        print(f"  {name:40s} {old['min_us']:10.2f} -> {result['min_us']:10.2f} us "
+              f"({change:+.1%}){flag}")
+
+    for name in baseline.get("results", {}):
+        if name in current["results"]:
+            continue
+        if selected and not any(name.startswith(prefix) for prefix in selected):
+            continue   # not asked for this run
+        print(f"  {name:40s} MISSING from this run")
+        failures.append(name)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the quiz's hot paths.")
+    parser.add_argument("--save", metavar="FILE", help="write results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against earlier results")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="fail if a benchmark gets slower than this fraction (default 0.25)"
+    )
+    parser.add_argument("only", nargs="*", help="run only benchmarks starting with these names")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    current = run(args.only, baseline, args.threshold)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if baseline is not None:
+        failures = compare(current, baseline, args.threshold, args.only)
+        if failures:
+            print(f"{len(failures)} regressed or missing: {', '.join(failures)}")
+            sys.exit(1)
@@ -0,0 +1,124 @@
+"""
+Load generator for classroom_server.py.
+
+    python classroom_bench.py --clients 300 --answers 50
+
+Starts the server in a child process pinned to a single CPU core (where
+the OS allows it), then opens the requested number of concurrent
+WebSocket clients.  Every client joins, answers questions as fast as the
+server replies (mostly right, sometimes wrong, sometimes skipping), and
+measures the round-trip time of each answer.  The report gives throughput
+and the p50 / p90 / p99 / max answer latency across all clients.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import multiprocessing
+import os
+import random
+import time
+
+from classroom_server import WebSocket, serve
+from state_data import states_capitals
+
+
+def run_server(host, port, ready):
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+    event = asyncio.Event()
+
+    async def main():
+        task = asyncio.ensure_future(serve(host, port, ready=event))
+        await event.wait()
+        ready.set()
+        await task
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+async def client(host, port, n, answers, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    writer.write(
+        f"GET /ws HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+        f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+        "Sec-WebSocket-Version: 13\r\n\r\n".encode("latin-1")
+    )
+    await reader.readuntil(b"\r\n\r\n")
+    ws = WebSocket(reader, writer, client=True)
+
+    await ws.send_json({"type": "hello", "student": f"bench-{n}"})
+    await ws.recv()                                  # session
+    question = json.loads(await ws.recv())           # first question
+
+    for _ in range(answers):
+        if question["type"] != "question":
+            break
+        roll = rng.random()
+        if roll < 0.05:
+            message = {"type": "skip"}
+        else:
+            answer = states_capitals[question["state"]] if roll < 0.8 else "Springfield"
+            message = {"type": "answer", "answer": answer}
+
+        start = time.perf_counter()
+        await ws.send_json(message)
+        reply = json.loads(await ws.recv())
+        latencies.append((time.perf_counter() - start) * 1000)
+        question = reply["next"]
+    ws.close()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_clients(host, port, clients, answers, seed):
+    latencies = []
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, n, answers, latencies, random.Random(rng.random()))
+        for n in range(clients)
+    ))
+    return latencies, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the classroom server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--answers", type=int, default=50, help="answers per client")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=run_server, args=(args.host, args.port, ready), daemon=True
+    )
+    server.start()
+    if not ready.wait(10):
+        raise SystemExit("server did not start")
+
+    try:
+        latencies, elapsed = asyncio.run(
+            run_clients(args.host, args.port, args.clients, args.answers, args.seed)
+        )
+    finally:
+        server.terminate()
+
+    latencies.sort()
+    print(f"{args.clients} concurrent sessions, {len(latencies)} answers in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} answers/s)")
+    print(f"answer latency  p50 {percentile(latencies, 50):.2f} ms  "
+          f"p90 {percentile(latencies, 90):.2f} ms  "
+          f"p99 {percentile(latencies, 99):.2f} ms  "
+          f"max {latencies[-1] if latencies else 0:.2f} ms")
@@ -0,0 +1,443 @@
+"""
+Classroom server: one teacher machine serves the quiz to every student
+browser on the LAN, no Tk needed on the student machines.
+
+    python classroom_server.py --port 8765
+    # students open http://<teacher-machine>:8765/
+
+Everything runs on one asyncio event loop using only the standard
+library: a tiny HTTP/1.1 handler serves the page, and the page talks to
+the server over a WebSocket.  Each connection gets its own QuizEngine, so
+the questions, grading and scoring follow exactly the same rules as the
+Tk StateCapitalQuiz (states retire once answered correctly).
+
+Messages are JSON text frames.  Client -> server:
+
+    {"type": "hello", "student": "ana", "session": "<id to resume>"}
+    {"type": "answer", "answer": "Columbus"}
+    {"type": "skip"}
+    {"type": "facts"}
+
+Server -> client, each carrying the fields the page needs:
+
+    {"type": "session", "session": "<id>", "student": "ana"}
+    {"type": "question", "state": "Ohio", "score": 3, "total": 5}
+    {"type": "result", "state": "Ohio", "correct": true, "verdict": "exact",
+     "expected": "Columbus", "next": {<question or done>}}
+    {"type": "skipped", "state": "Ohio", "expected": "Columbus", "next": {...}}
+    {"type": "facts", "state": "Ohio", "flower": "...", "bird": "..."}
+    {"type": "done", "score": 48, "total": 50}
+    {"type": "error", "message": "Type your answer first"}
+
+"error" answers a message the server can't act on (an empty answer, or a
+message that isn't a JSON object); the session carries on.  Frames that
+break the WebSocket protocol, such as unmasked client frames, end the
+connection with close code 1002, and messages over MAX_FRAME with 1009.
+
+See classroom_bench.py for a load generator.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import uuid
+from collections import OrderedDict
+
+from answer_history import AnswerLog
+from quiz_engine import QuizEngine
+from state_data import bank, state_facts, states_capitals
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_SESSIONS = 5000        # oldest idle sessions are forgotten past this
+MAX_FRAME = 1 << 16        # answers are short; refuse anything huge
+NOT_AN_OBJECT = {"type": "error", "message": "Messages must be JSON objects"}
+
+OP_CONT, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_TOO_BIG = 1009
+
+
+class ConnectionClosed(Exception):
+    def __init__(self, code=None):
+        super().__init__(code)
+        self.code = code    # close code to send back, if any
+
+
+class ProtocolError(ConnectionClosed):
+    def __init__(self, code=CLOSE_PROTOCOL_ERROR):
+        super().__init__(code)
+
+
+# ---------- WebSocket framing (RFC 6455) ----------
+
+def _mask(payload, key):
+    """XOR payload with the 4-byte key, a machine word at a time."""
+    n = len(payload)
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "little") ^ int.from_bytes(repeated, "little")).to_bytes(n, "little")
+
+
+def encode_frame(payload, opcode=OP_TEXT, mask=False):
+    """Build one final frame.  Clients must mask; servers must not."""
+    n = len(payload)
+    first = 0x80 | opcode
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        header = struct.pack("!BB", first, mask_bit | n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", first, mask_bit | 126, n)
+    else:
+        header = struct.pack("!BBQ", first, mask_bit | 127, n)
+    if mask:
+        key = os.urandom(4)
+        return header + key + _mask(payload, key)
+    return header + payload
+
+
+async def read_frame(reader, limit=MAX_FRAME, require_mask=False):
+    """
+    Return (fin, opcode, payload) for the next frame.  A data frame may
+    carry at most limit bytes; servers pass require_mask=True, since every
+    client frame must be masked.
+    """
+    try:
+        b1, b2 = await reader.readexactly(2)
+        fin = bool(b1 & 0x80)
+        opcode = b1 & 0x0F
+        n = b2 & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", await reader.readexactly(8))[0]
+        masked = b2 & 0x80
+        if require_mask and not masked:
+            raise ProtocolError()
+        if opcode >= OP_CLOSE:
+            if not fin or n > 125:
+                raise ProtocolError()   # control frames are short and never fragmented
+        elif n > limit:
+            raise ConnectionClosed(CLOSE_TOO_BIG)
+        key = await reader.readexactly(4) if masked else None
+        payload = await reader.readexactly(n)
+    except asyncio.IncompleteReadError:
+        raise ConnectionClosed()
+    if key is not None:
+        payload = _mask(payload, key)
+    return fin, opcode, payload
+
+
+class WebSocket:
+    def __init__(self, reader, writer, client=False):
+        self.reader = reader
+        self.writer = writer
+        self.client = client    # clients mask what they send
+
+    async def recv(self):
+        """
+        Next text message as a str; answers pings and raises on close.
+        Control frames may arrive between the fragments of a message, so
+        the partial message is kept while they are handled.
+        """
+        message = b""
+        message_opcode = None
+        while True:
+            # The limit covers a fragmented message as a whole
+            fin, opcode, payload = await read_frame(
+                self.reader, MAX_FRAME - len(message), require_mask=not self.client
+            )
+            if opcode == OP_PING:
+                self.writer.write(encode_frame(payload, OP_PONG, self.client))
+                continue
+            if opcode == OP_CLOSE:
+                raise ConnectionClosed()
+            if opcode >= OP_CLOSE:
+                continue
+            if (opcode == OP_CONT) != (message_opcode is not None):
+                raise ProtocolError()   # continuation with nothing to continue, or vice versa
+            if opcode != OP_CONT:
+                message_opcode = opcode
+            message += payload
+            if not fin:
+                continue
+            if message_opcode == OP_TEXT:
+                return message.decode("utf-8")
+            message = b""           # binary messages are ignored
+            message_opcode = None
+
+    async def send(self, text):
+        self.writer.write(encode_frame(text.encode("utf-8"), OP_TEXT, self.client))
+        await self.writer.drain()
+
+    async def send_json(self, message):
+        await self.send(json.dumps(message, ensure_ascii=False))
+
+    def close(self, code=None):
+        payload = b"" if code is None else struct.pack("!H", code)
+        try:
+            self.writer.write(encode_frame(payload, OP_CLOSE, self.client))
+        except Exception:
+            pass
+        self.writer.close()
+
+
+# ---------- Quiz sessions ----------
+
+class Session:
+    def __init__(self, student):
+        self.id = uuid.uuid4().hex
+        self.student = student
+        self.engine = QuizEngine(states_capitals, retire_correct=True, bank=bank)
+
+    def question(self):
+        engine = self.engine
+        if engine.state is None:
+            return {
+                "type": "done",
+                "score": engine.score,
+                "total": engine.total_questions,
+            }
+        return {
+            "type": "question",
+            "state": engine.state,
+            "score": engine.score,
+            "total": engine.total_questions,
+            "remaining": engine.remaining,
+        }
+
+
+class ClassroomServer:
+    def __init__(self, log_dir=None):
+        self.sessions = OrderedDict()    # id -> Session, least recently used first
+        self.log_dir = log_dir
+        self.logs = {}                   # student -> AnswerLog, when logging
+
+    def _session_for(self, hello):
+        session = self.sessions.get(hello.get("session") or "")
+        if session is None:
+            session = Session(str(hello.get("student") or "student")[:64])
+            session.engine.next_question()
+            self.sessions[session.id] = session
+            while len(self.sessions) > MAX_SESSIONS:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session.id)
+        return session
+
+    def _log(self, session, answer, correct):
+        if self.log_dir is None:
+            return
+        log = self.logs.get(session.student)
+        if log is None:
+            log = self.logs[session.student] = AnswerLog(self.log_dir, session.student)
+        engine = session.engine
+        log.record(engine.state, answer, correct, engine.last_result.verdict, engine.last_response_ms)
+
+    def handle(self, session, message):
+        """Apply one client message to its session and return the reply."""
+        engine = session.engine
+        kind = message.get("type")
+
+        if kind == "answer" and engine.state is not None:
+            answer = str(message.get("answer", ""))[:200].strip()
+            if not answer:
+                return {"type": "error", "message": "Type your answer first"}
+            state = engine.state
+            correct = engine.check_answer(answer)
+            self._log(session, answer, correct)
+            result = engine.last_result
+            engine.next_question()
+            return {
+                "type": "result",
+                "state": state,
+                "correct": correct,
+                "verdict": result.verdict,
+                "expected": result.expected,
+                "next": session.question(),
+            }
+
+        if kind == "skip" and engine.state is not None:
+            state = engine.state
+            expected = engine.correct_answer()
+            engine.skip()
+            engine.next_question()
+            return {"type": "skipped", "state": state, "expected": expected, "next": session.question()}
+
+        if kind == "facts" and engine.state is not None:
+            flower, bird = state_facts.get(engine.state, ("(not in table)", "(not in table)"))
+            return {"type": "facts", "state": engine.state, "flower": flower, "bird": bird}
+
+        return session.question()
+
+    # ---------- Connections ----------
+
+    async def serve_client(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+
+        lines = request.decode("latin-1").split("\r\n")
+        try:
+            method, path, _ = lines[0].split(" ", 2)
+        except ValueError:
+            writer.close()
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+            await self._websocket(reader, writer, headers)
+        elif method == "GET" and path in ("/", "/index.html"):
+            self._http(writer, "200 OK", "text/html; charset=utf-8", PAGE.encode("utf-8"))
+        else:
+            self._http(writer, "404 Not Found", "text/plain", b"Not found")
+
+    def _http(self, writer, status, content_type, body):
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        writer.close()
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "").encode("latin-1")
+        accept = base64.b64encode(hashlib.sha1(key + WS_GUID).digest()).decode("ascii")
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode("latin-1")
+        )
+        ws = WebSocket(reader, writer)
+        close_code = None
+        try:
+            hello = json.loads(await ws.recv())
+            if not isinstance(hello, dict):
+                await ws.send_json(NOT_AN_OBJECT)
+                return
+            session = self._session_for(hello)
+            await ws.send_json({"type": "session", "session": session.id, "student": session.student})
+            await ws.send_json(session.question())
+            while True:
+                try:
+                    message = json.loads(await ws.recv())
+                except ValueError:
+                    continue
+                if not isinstance(message, dict):
+                    await ws.send_json(NOT_AN_OBJECT)
+                    continue
+                await ws.send_json(self.handle(session, message))
+        except ConnectionClosed as e:
+            close_code = e.code
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            ws.close(close_code)
+
+    def close(self):
+        for log in self.logs.values():
+            log.close()
+
+
+async def serve(host, port, log_dir=None, ready=None):
+    app = ClassroomServer(log_dir)
+    server = await asyncio.start_server(app.serve_client, host, port, backlog=1024)
+    print(f"Classroom quiz on http://{host}:{port}/")
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        app.close()
+
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>State Capitals Quiz</title>
+<style>
+ body { font-family: Helvetica, sans-serif; background: #1e3a8a; margin: 0; }
+ main { background: #bfdbfe; max-width: 420px; margin: 40px auto; padding: 20px;
+        border: 3px ridge #93c5fd; text-align: center; }
+ h1 { background: #1d4ed8; color: white; margin: -20px -20px 10px; padding: 10px; }
+ #state { font-size: 28px; font-weight: bold; margin: 12px; }
+ input { font-size: 18px; width: 70%; }
+ button { font-size: 15px; margin: 8px 4px; padding: 4px 10px; }
+ #feedback { min-height: 3em; color: #0f766e; }
+</style></head>
+<body><main>
+<h1>State Capitals Quiz</h1>
+<div id="who"><input id="name" placeholder="Your name"> <button id="join">Join</button></div>
+<div id="quiz" hidden>
+ <div>Type the capital for the state below:</div>
+ <div id="state"></div>
+ <input id="answer" autocomplete="off">
+ <div><button id="check">Check Answer &#x2705;</button><button id="skip">Skip</button>
+ <button id="facts">State Facts</button></div>
+ <div id="feedback"></div>
+ <div id="score"><b>Score: 0/0</b></div>
+</div>
+</main>
+<script>
+const $ = id => document.getElementById(id);
+let ws;
+function show(q) {
+  if (q.type === "done") {
+    $("state").textContent = "All done! \\u{1F389}";
+    $("answer").disabled = true;
+  } else {
+    $("state").textContent = q.state;
+  }
+  $("score").innerHTML = `<b>Score: ${q.score}/${q.total}</b>`;
+  $("answer").value = "";
+  $("answer").focus();
+}
+function join() {
+  ws = new WebSocket(`ws://${location.host}/ws`);
+  ws.onopen = () => ws.send(JSON.stringify({type: "hello", student: $("name").value,
+                                            session: sessionStorage.getItem("session")}));
+  ws.onmessage = ev => {
+    const m = JSON.parse(ev.data);
+    if (m.type === "session") { sessionStorage.setItem("session", m.session);
+                                $("who").hidden = true; $("quiz").hidden = false; }
+    else if (m.type === "question" || m.type === "done") show(m);
+    else if (m.type === "result") {
+      $("feedback").textContent = m.correct
+        ? (m.verdict === "close" ? `Close enough! It's spelled ${m.expected}.` : `Correct! ${m.expected}.`)
+        : `Oops! The capital of ${m.state} is ${m.expected}.`;
+      $("feedback").style.color = m.correct ? "#15803d" : "#b91c1c";
+      show(m.next);
+    }
+    else if (m.type === "skipped") {
+      $("feedback").textContent = `Skipped! The capital of ${m.state} is ${m.expected}.`;
+      show(m.next);
+    }
+    else if (m.type === "facts")
+      $("feedback").textContent = `${m.state}: flower ${m.flower}, bird ${m.bird}`;
+    else if (m.type === "error") $("feedback").textContent = m.message;
+  };
+}
+$("join").onclick = join;
+$("check").onclick = () => ws.send(JSON.stringify({type: "answer", answer: $("answer").value}));
+$("answer").onkeydown = e => { if (e.key === "Enter") $("check").onclick(); };
+$("skip").onclick = () => ws.send(JSON.stringify({type: "skip"}));
+$("facts").onclick = () => ws.send(JSON.stringify({type: "facts"}));
+</script>
+</body></html>
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the quiz to a classroom over the LAN.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--log-dir", help="save every answer to per-student history logs here")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.log_dir))
+    except KeyboardInterrupt:
+        pass
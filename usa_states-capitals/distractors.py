@@ -0,0 +1,205 @@
+"""
+Plausible wrong options for multiple-choice questions.
+
+A good distractor for "Capital of Ohio?" is a capital the learner might
+really confuse with Columbus: one from a neighbouring state (Indianapolis,
+Harrisburg) or one that looks alike (Columbia).  DistractorTable works out
+both kinds for every prompt once, up front:
+
+  * geographic neighbours come from a 2-d KD-tree over the bank's map
+    positions, so finding the k nearest states is O(log n) per state
+    instead of measuring the distance to every other state;
+  * lexical neighbours come from an inverted index of letter trigrams, so
+    only answers sharing some trigram are ever compared.
+
+After that, building a question is a couple of random picks from a short
+precomputed list, no matter how big the bank is.
+
+    python distractors.py --entries 40000    # time the precompute
+"""
+import argparse
+import heapq
+import random
+import time
+
+from answer_matching import normalize
+
+GEO_NEIGHBOURS = 6       # nearest states kept per prompt
+LEXICAL_NEIGHBOURS = 4   # look-alike answers kept per prompt
+MAX_POSTING = 200        # trigrams shared by more answers than this are too common to help
+
+_cache = {}
+
+
+class KDTree:
+    """Static 2-d tree over {key: (x, y)} for k-nearest-neighbour queries."""
+
+    def __init__(self, points):
+        items = [(x, y, key) for key, (x, y) in points.items()]
+        self.root = self._build(items, 0)
+
+    def _build(self, items, axis):
+        if not items:
+            return None
+        items.sort(key=lambda item: item[axis])
+        mid = len(items) // 2
+        x, y, key = items[mid]
+        # node: (x, y, key, axis, left, right)
+        return (x, y, key, axis,
+                self._build(items[:mid], 1 - axis),
+                self._build(items[mid + 1:], 1 - axis))
+
+    def nearest(self, x, y, k, exclude=None):
+        """The k keys closest to (x, y), nearest first, skipping `exclude`."""
+        best = []       # max-heap of (-dist2, tiebreak, key)
+        counter = 0
+        stack = [(self.root, 0.0)]
+        target = (x, y)
+        while stack:
+            node, bound = stack.pop()
+            # bound: squared distance from the target to this node's side of
+            # its parent's split; skip it once k closer points are known
+            if node is None or (len(best) == k and bound >= -best[0][0]):
+                continue
+            nx, ny, key, axis, left, right = node
+            if key != exclude:
+                d2 = (nx - x) ** 2 + (ny - y) ** 2
+                if len(best) < k:
+                    heapq.heappush(best, (-d2, counter, key))
+                elif d2 < -best[0][0]:
+                    heapq.heapreplace(best, (-d2, counter, key))
+                counter += 1
+            diff = target[axis] - (nx, ny)[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            stack.append((far, diff * diff))
+            stack.append((near, 0.0))
+        best.sort(key=lambda entry: (-entry[0], entry[1]))
+        return [key for _, _, key in best]
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def lexical_neighbours(names, k=LEXICAL_NEIGHBOURS):
+    """
+    name -> the k most similar other names (Dice coefficient over letter
+    trigrams), found through a trigram -> names inverted index.
+    """
+    grams = {name: _trigrams(normalize(name)) for name in names}
+    postings = {}
+    for name, name_grams in grams.items():
+        for gram in name_grams:
+            postings.setdefault(gram, []).append(name)
+
+    neighbours = {}
+    for name, name_grams in grams.items():
+        shared = {}
+        for gram in name_grams:
+            posting = postings[gram]
+            if len(posting) > MAX_POSTING:
+                continue
+            for other in posting:
+                if other != name:
+                    shared[other] = shared.get(other, 0) + 1
+        size = len(name_grams)
+        ranked = heapq.nlargest(
+            k, shared.items(),
+            key=lambda item: 2 * item[1] / (size + len(grams[item[0]]))
+        )
+        neighbours[name] = [other for other, _ in ranked]
+    return neighbours
+
+
+class DistractorTable:
+    """
+    prompt -> precomputed wrong answers, nearest (geographically, then
+    lexically) first.  items maps prompt -> answer; positions, if given,
+    maps prompt -> (x, y).
+    """
+
+    def __init__(self, items, positions=None,
+                 geo_k=GEO_NEIGHBOURS, lexical_k=LEXICAL_NEIGHBOURS):
+        self.items = dict(items)
+        self._answers = list(dict.fromkeys(self.items.values()))
+        self.candidates = {}
+
+        geo = {}
+        if positions:
+            placed = {p: positions[p] for p in self.items if p in positions}
+            tree = KDTree(placed)
+            for prompt, (x, y) in placed.items():
+                geo[prompt] = [self.items[p] for p in tree.nearest(x, y, geo_k + 1, exclude=prompt)]
+        lexical = lexical_neighbours(self._answers, lexical_k)
+
+        for prompt, answer in self.items.items():
+            correct = normalize(answer)
+            seen = {correct}
+            picked = []
+            for option in geo.get(prompt, [])[:geo_k] + lexical.get(answer, []):
+                key = normalize(option)
+                if key not in seen:
+                    seen.add(key)
+                    picked.append(option)
+            self.candidates[prompt] = tuple(picked)
+
+    def choices(self, prompt, n=4, rng=random):
+        """The correct answer plus n - 1 distractors, shuffled."""
+        answer = self.items[prompt]
+        wrong = list(self.candidates[prompt])
+        if len(wrong) > n - 1:
+            wrong = rng.sample(wrong, n - 1)
+        # Tiny banks may not have enough neighbours; top up at random
+        tries = 0
+        while len(wrong) < n - 1 and tries < 10 * n and len(self._answers) > 1:
+            tries += 1
+            option = rng.choice(self._answers)
+            if option != answer and option not in wrong:
+                wrong.append(option)
+        options = wrong + [answer]
+        rng.shuffle(options)
+        return options
+
+
+def distractor_table(items, positions=None):
+    """
+    Shared DistractorTable for a bank, built on first use; re-opening the
+    quiz (or a second window) on the same bank reuses it.
+    """
+    key = (tuple(items.items()), tuple(positions.items()) if positions else None)
+    table = _cache.get(key)
+    if table is None:
+        table = _cache[key] = DistractorTable(items, positions)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time distractor precomputation.")
+    parser.add_argument("--entries", type=int, default=40000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    syllables = ["ar", "bel", "cor", "dan", "el", "fon", "gar", "ham", "ing", "ton", "ville", "burg"]
+    items = {}
+    positions = {}
+    for n in range(args.entries):
+        name = "".join(rng.choice(syllables) for _ in range(3)).title()
+        items[f"Place {n}"] = f"{name} {n % 997}"
+        positions[f"Place {n}"] = (rng.random() * 940, rng.random() * 680)
+
+    start = time.perf_counter()
+    table = distractor_table(items, positions)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for prompt in list(items)[:10000]:
+        table.choices(prompt, rng=rng)
+    per_question = (time.perf_counter() - start) * 1_000_000 / min(10000, len(items))
+    start = time.perf_counter()
+    distractor_table(items, positions)
+    cached_ms = (time.perf_counter() - start) * 1000
+    print(f"{args.entries} entries: precompute {build:.2f}s (cached {cached_ms:.1f} ms), "
+          f"{per_question:.1f} us per question")
+    print("Place 0:", items["Place 0"], "->", table.choices("Place 0", rng=rng))
@@ -0,0 +1,124 @@
+"""
+Pooled particle renderer for the fireworks celebration.
+
+All canvas items (one glow ring plus a handful of sparks per burst) are
+created once up front.  Every frame only moves and recolours the pooled
+items with coords/itemconfigure, so the canvas never grows and Tk has a
+fixed number of items to redraw no matter how long the show runs.
+
+Each frame is timed, including Tk redrawing the canvas (update_idletasks
+runs inside the timed region; otherwise the redraw would happen after
+the timer stopped and go unmeasured).  The delay to the next frame is
+shortened by the time the frame itself took, which keeps the frame rate
+steady on slow machines.
+When the show ends, on_finish (if given) receives frame_stats().
+"""
+import random
+import time
+import tkinter as tk
+
+COLORS = ["red", "yellow", "orange", "cyan", "magenta", "lime", "white"]
+
+
+class FireworksRenderer:
+    def __init__(self, canvas, bursts=8, sparks_per_burst=6,
+                 frame_ms=80, max_frames=50, rng=None, on_finish=None):
+        self.canvas = canvas
+        self.bursts = bursts
+        self.sparks_per_burst = sparks_per_burst
+        self.frame_ms = frame_ms
+        self.max_frames = max_frames
+        self.rng = rng if rng is not None else random.Random()
+        self.on_finish = on_finish   # called with frame_stats() after the last frame
+
+        self.glows = []      # one ring item per burst
+        self.sparks = []     # sparks_per_burst dot items per burst
+        self.frame = 0
+        self.frame_times = []   # seconds spent updating and redrawing each frame
+        self._after_id = None
+
+        self._create_pool()
+
+    def _create_pool(self):
+        """Allocate every canvas item once; frames only reuse them."""
+        for _ in range(self.bursts):
+            self.glows.append(self.canvas.create_oval(
+                0, 0, 0, 0, outline="", width=2, fill="", tags="fireworks"
+            ))
+            for _ in range(self.sparks_per_burst):
+                self.sparks.append(self.canvas.create_oval(
+                    0, 0, 0, 0, outline="", fill="", tags="fireworks"
+                ))
+
+    def start(self):
+        self.frame = 0
+        self.frame_times = []
+        self._tick()
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.canvas.after_cancel(self._after_id)
+            except tk.TclError:
+                pass  # canvas already destroyed
+            self._after_id = None
+
+    def draw_frame(self):
+        """Move and recolour the pooled items for one frame."""
+        rng = self.rng
+        canvas = self.canvas
+        width = int(canvas["width"])
+        height = int(canvas["height"])
+        spark = 0
+
+        for glow in self.glows:
+            x = rng.randint(40, width - 40)
+            y = rng.randint(40, height - 40)
+            radius = rng.randint(8, 20)
+            color = rng.choice(COLORS)
+
+            # central glow
+            canvas.coords(glow, x - radius, y - radius, x + radius, y + radius)
+            canvas.itemconfigure(glow, outline=color)
+
+            # small spark dots around
+            for _ in range(self.sparks_per_burst):
+                item = self.sparks[spark]
+                spark += 1
+                sx = x + rng.randint(-radius * 2, radius * 2)
+                sy = y + rng.randint(-radius * 2, radius * 2)
+                canvas.coords(item, sx - 2, sy - 2, sx + 2, sy + 2)
+                canvas.itemconfigure(item, outline=color, fill=color)
+
+    def _tick(self):
+        self._after_id = None
+        try:
+            if not self.canvas.winfo_exists():
+                return
+        except tk.TclError:
+            return  # window closed mid-show
+
+        start = time.perf_counter()
+        self.draw_frame()
+        self.canvas.update_idletasks()   # the redraw is part of the frame's cost
+        elapsed = time.perf_counter() - start
+        self.frame_times.append(elapsed)
+        self.frame += 1
+
+        # Keep animating for a while, then stop
+        if self.frame < self.max_frames:
+            delay = max(1, self.frame_ms - int(elapsed * 1000))
+            self._after_id = self.canvas.after(delay, self._tick)
+        elif self.on_finish is not None:
+            self.on_finish(self.frame_stats())
+
+    def frame_stats(self):
+        """Return (frames, average ms, worst ms) for the frames drawn so far."""
+        if not self.frame_times:
+            return 0, 0.0, 0.0
+        total = sum(self.frame_times)
+        return (
+            len(self.frame_times),
+            total * 1000 / len(self.frame_times),
+            max(self.frame_times) * 1000,
+        )
@@ -0,0 +1,138 @@
+"""
+Collision-free placement of capital labels on the map.
+
+solve_layout takes each state's dot position and the pixel size of its
+label text, tries a ring of candidate spots around the dot (right of the
+dot first, which is where labels always went, then the other sides, then
+a wider ring) and greedily keeps the cheapest spot.  A spot costs more the
+more it overlaps labels already placed, other states' dots, or the map
+edge.  Crowded states (many neighbours, e.g. New England) are placed first
+so they get first pick.
+
+Placed rectangles live in a uniform grid, so checking a candidate only
+looks at the few labels in the cells it touches instead of every label on
+the map.  Layouts are cached per map size, font and label set, so
+re-revealing or re-opening the map costs a dictionary lookup.
+"""
+
+GRID_CELL = 64        # spatial index cell size in pixels
+DOT_RADIUS = 4        # pixels around each dot that labels should not cover
+GAP = 3               # space between a dot and its label
+
+_cache = {}
+
+
+class GridIndex:
+    """Uniform grid of axis-aligned rectangles (x0, y0, x1, y1)."""
+
+    def __init__(self, cell=GRID_CELL):
+        self.cell = cell
+        self.cells = {}
+
+    def _keys(self, rect):
+        c = self.cell
+        x0, y0, x1, y1 = rect
+        for gx in range(int(x0 // c), int(x1 // c) + 1):
+            for gy in range(int(y0 // c), int(y1 // c) + 1):
+                yield gx, gy
+
+    def insert(self, rect):
+        for key in self._keys(rect):
+            self.cells.setdefault(key, []).append(rect)
+
+    def overlapping(self, rect):
+        """Yield every stored rectangle that intersects rect (once each)."""
+        seen = set()
+        x0, y0, x1, y1 = rect
+        for key in self._keys(rect):
+            for other in self.cells.get(key, ()):
+                if id(other) in seen:
+                    continue
+                seen.add(id(other))
+                if other[0] < x1 and x0 < other[2] and other[1] < y1 and y0 < other[3]:
+                    yield other
+
+
+def _overlap_area(a, b):
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    return w * h if w > 0 and h > 0 else 0
+
+
+def _candidates(x, y, w, h):
+    """Candidate top-left corners around a dot, most preferred first."""
+    near = DOT_RADIUS + GAP
+    spots = []
+    for ring in (1, 2.5):
+        d = near * ring
+        spots += [
+            (x + 10 * ring, y - 8 * ring - h / 2),   # the original spot: right, slightly up
+            (x + d, y - h / 2),                      # right
+            (x - d - w, y - h / 2),                  # left
+            (x - w / 2, y - d - h),                  # above
+            (x - w / 2, y + d),                      # below
+            (x + d, y - d - h),                      # above right
+            (x - d - w, y - d - h),                  # above left
+            (x + d, y + d),                          # below right
+            (x - d - w, y + d),                      # below left
+        ]
+    return spots
+
+
+def solve_layout(anchors, extents, width, height, font=None):
+    """
+    anchors: mapping of key -> (x, y) dot position
+    extents: mapping of key -> (w, h) label size in pixels
+    width, height: map size, used to keep labels on the map
+    font:    anything hashable describing the font (only used for caching)
+
+    Returns a mapping of key -> (x, y) top-left corner for each label
+    (draw with anchor="nw").
+    """
+    cache_key = (
+        width, height, font,
+        tuple(sorted((k, anchors[k], extents[k]) for k in anchors)),
+    )
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    dots = GridIndex()
+    for x, y in anchors.values():
+        dots.insert((x - DOT_RADIUS, y - DOT_RADIUS, x + DOT_RADIUS, y + DOT_RADIUS))
+
+    # Crowded dots choose first
+    def crowding(key):
+        x, y = anchors[key]
+        box = (x - GRID_CELL, y - GRID_CELL, x + GRID_CELL, y + GRID_CELL)
+        return -sum(1 for _ in dots.overlapping(box))
+
+    labels = GridIndex()
+    placed = {}
+    for key in sorted(anchors, key=crowding):
+        x, y = anchors[key]
+        w, h = extents[key]
+        own_dot = (x - DOT_RADIUS, y - DOT_RADIUS, x + DOT_RADIUS, y + DOT_RADIUS)
+
+        best = None
+        best_cost = None
+        for rank, (lx, ly) in enumerate(_candidates(x, y, w, h)):
+            rect = (lx, ly, lx + w, ly + h)
+            cost = rank * 2
+            for other in labels.overlapping(rect):
+                cost += _overlap_area(rect, other) * 4
+            for dot in dots.overlapping(rect):
+                if dot != own_dot:
+                    cost += _overlap_area(rect, dot) * 8
+            outside = w * h - _overlap_area(rect, (0, 0, width, height))
+            cost += outside * 16
+            if best_cost is None or cost < best_cost:
+                best, best_cost = rect, cost
+                if cost == 0:
+                    break  # the preferred spot is free
+
+        labels.insert(best)
+        placed[key] = (best[0], best[1])
+
+    _cache[cache_key] = placed
+    return placed
@@ -0,0 +1,147 @@
+"""
+Response-latency tracking per state.
+
+The engine stamps each prompt with time.perf_counter() when it is shown
+and again when it is answered or skipped.  The difference goes into a
+LatencyHistogram for that state.
+
+Histograms use fixed, logarithmically spaced buckets (50 ms up to two
+minutes, about 12% wide each) plus running count/sum/min/max.  Memory per
+state is constant no matter how long a session runs, and percentiles are
+read straight off the bucket counts.
+"""
+import math
+
+MIN_MS = 50.0
+MAX_MS = 120_000.0
+BUCKETS = 64
+_LOG_MIN = math.log(MIN_MS)
+_LOG_STEP = (math.log(MAX_MS) - _LOG_MIN) / BUCKETS
+
+ANSWERED = "answered"
+SKIPPED = "skipped"
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (BUCKETS + 2)   # [under MIN_MS] + buckets + [over MAX_MS]
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, ms):
+        if ms < MIN_MS:
+            bucket = 0
+        elif ms >= MAX_MS:
+            bucket = BUCKETS + 1
+        else:
+            bucket = 1 + int((math.log(ms) - _LOG_MIN) / _LOG_STEP)
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += ms
+        if self.min is None or ms < self.min:
+            self.min = ms
+        if self.max is None or ms > self.max:
+            self.max = ms
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p):
+        """Approximate p-th percentile (0-100) in ms; within one bucket width."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                if bucket == 0:
+                    return self.min
+                if bucket == BUCKETS + 1:
+                    return self.max
+                # geometric middle of the bucket, clamped to what was seen
+                ms = math.exp(_LOG_MIN + (bucket - 0.5) * _LOG_STEP)
+                return min(max(ms, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.mean,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "min_ms": self.min,
+            "max_ms": self.max,
+        }
+
+
+class LatencyTracker:
+    def __init__(self):
+        self.by_state = {}   # (state, outcome) -> LatencyHistogram
+        self.overall = {ANSWERED: LatencyHistogram(), SKIPPED: LatencyHistogram()}
+
+    def record(self, state, ms, outcome=ANSWERED):
+        hist = self.by_state.get((state, outcome))
+        if hist is None:
+            hist = self.by_state[(state, outcome)] = LatencyHistogram()
+        hist.add(ms)
+        self.overall[outcome].add(ms)
+
+    def histogram(self, state, outcome=ANSWERED):
+        return self.by_state.get((state, outcome))
+
+    def median_ms(self, state):
+        hist = self.by_state.get((state, ANSWERED))
+        return hist.percentile(50) if hist is not None else None
+
+    def slowest(self, n=5, min_count=1):
+        """The n states with the highest median answer time."""
+        ranked = [
+            (hist.percentile(50), state)
+            for (state, outcome), hist in self.by_state.items()
+            if outcome == ANSWERED and hist.count >= min_count
+        ]
+        ranked.sort(reverse=True)
+        return [(state, ms) for ms, state in ranked[:n]]
+
+    def report(self):
+        """Plain-data snapshot for tools and the debug overlay."""
+        return {
+            "overall": {outcome: hist.summary() for outcome, hist in self.overall.items()},
+            "states": {
+                f"{state}/{outcome}": hist.summary()
+                for (state, outcome), hist in sorted(self.by_state.items())
+            },
+        }
+
+
+def _secs(ms):
+    return "-" if ms is None else f"{ms / 1000:.1f}s"
+
+
+def overlay_text(tracker, state=None):
+    """Multi-line summary shown by the GUIs' F12 debug overlay."""
+    lines = ["Response latency (F12 to hide)"]
+    if state is not None:
+        hist = tracker.histogram(state)
+        if hist is not None:
+            lines.append(
+                f"{state}: n={hist.count} p50 {_secs(hist.percentile(50))} "
+                f"p90 {_secs(hist.percentile(90))}"
+            )
+        else:
+            lines.append(f"{state}: not answered yet")
+    for outcome, hist in tracker.overall.items():
+        lines.append(
+            f"all {outcome}: n={hist.count} p50 {_secs(hist.percentile(50))} "
+            f"p90 {_secs(hist.percentile(90))}"
+        )
+    slowest = tracker.slowest(3)
+    if slowest:
+        lines.append("slowest: " + ", ".join(f"{s} {_secs(ms)}" for s, ms in slowest))
+    return "\n".join(lines)
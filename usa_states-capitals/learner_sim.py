@@ -0,0 +1,222 @@
+"""
+Monte Carlo simulation of many learners taking the quiz, spread across
+processes.
+
+    python learner_sim.py --sessions 1000000 --strategy leitner
+    python learner_sim.py --sessions 20000 --scaling    # speedup per worker count
+
+Each simulated learner forgets: every capital has a memory stability S
+(in prompts) and the chance of recalling it t prompts after it was last
+seen is exp(-t / S).  Recalling a capital makes it stick longer (S grows);
+seeing the right answer after a miss may teach it afresh.  Sessions run
+the real QuizEngine (and LeitnerScheduler) over states_capitals and
+report prompts-to-mastery.
+
+Mastery is judged on the learner, not by the strategy: a session ends once
+the learner would recall every state with probability >= RECALL_TARGET
+right now.  (Counting "answered correctly N times in a row" favoured
+Leitner, whose retired states are never asked again and so can never
+lose their streak, while uniform picking keeps re-testing every state.)
+If the scheduler retires everything before that, the session carries on
+with uniform review of all states, like the map quiz, until it gets there.
+
+Work is cut into chunks of sessions and handed to a ProcessPoolExecutor.
+Session n always draws from its own generator seeded from (seed, n), so
+results are the same however many workers run them, and workers only send
+back a small histogram, which keeps the speedup close to linear in cores.
+"""
+import argparse
+import math
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from quiz_engine import QuizEngine
+from scheduler import LeitnerScheduler
+from state_data import states_capitals
+
+STRATEGIES = ("uniform", "leitner")
+CHUNKS_PER_WORKER = 8    # enough chunks that an unlucky slow one doesn't idle the others
+MAX_PROMPTS = 20000
+RECALL_TARGET = 0.8      # mastered = every state recalled with at least this probability
+
+
+class ForgettingLearner:
+    """
+    A learner with an exponential forgetting curve per item.  The clock is
+    the number of prompts answered, like the scheduler's.
+    """
+
+    def __init__(self, items, rng, known_fraction=0.5, learn_rate=0.4,
+                 initial_stability=20.0, growth=3.0, known_stability=200.0):
+        self.rng = rng
+        self.learn_rate = learn_rate
+        self.initial_stability = initial_stability
+        self.growth = growth
+        self.clock = 0
+        self.items = list(items)
+        self.stability = {}   # item -> S in prompts; missing = not known at all
+        self.last_seen = {}
+        self.deadline = {}    # item -> last clock at which recall >= RECALL_TARGET
+        self._horizon = -math.log(RECALL_TARGET)
+        for item in self.items:
+            if rng.random() < known_fraction:
+                self._remember(item, known_stability)
+
+    def _remember(self, item, stability):
+        self.stability[item] = stability
+        self.last_seen[item] = self.clock
+        self.deadline[item] = self.clock + stability * self._horizon
+
+    def recall_probability(self, item):
+        stability = self.stability.get(item)
+        if stability is None:
+            return 0.0
+        return math.exp(-(self.clock - self.last_seen[item]) / stability)
+
+    def answer(self, item, correct_answer):
+        self.clock += 1
+        recalled = self.rng.random() < self.recall_probability(item)
+        if recalled:
+            self._remember(item, self.stability[item] * self.growth)
+        elif item in self.stability:
+            self._remember(item, self.stability[item])
+        return correct_answer if recalled else ""
+
+    def shown(self, item):
+        """Called after a wrong answer reveals the correct one."""
+        if self.rng.random() < self.learn_rate:
+            self._remember(item, self.initial_stability)
+
+    def recalls_all(self):
+        """True if every item would be recalled with probability >= RECALL_TARGET now."""
+        return len(self.deadline) == len(self.items) and self.clock <= min(self.deadline.values())
+
+
+def run_to_mastery(engine, learner, max_prompts=MAX_PROMPTS):
+    """
+    Prompts until learner.recalls_all(), the same stopping rule for every
+    strategy.  Once the engine has retired everything, review continues
+    with uniform picks over all states.
+    """
+    prompts = 0
+    while prompts < max_prompts and not learner.recalls_all():
+        state = engine.next_question()
+        if state is None:
+            engine = QuizEngine(engine.items, retire_correct=False, rng=learner.rng)
+            continue
+        prompts += 1
+        if not engine.check_answer(learner.answer(state, engine.correct_answer())):
+            learner.shown(state)
+    return prompts
+
+
+def session_rng(seed, n):
+    """Independent, reproducible stream for session n of a run."""
+    return random.Random(f"learner-sim/{seed}/{n}")
+
+
+def run_chunk(strategy, seed, start, count):
+    """Run sessions start..start+count-1; return a Counter of prompts-to-mastery."""
+    prompts = Counter()
+    for n in range(start, start + count):
+        rng = session_rng(seed, n)
+        scheduler = LeitnerScheduler(states_capitals, rng=rng) if strategy == "leitner" else None
+        engine = QuizEngine(states_capitals, retire_correct=False, rng=rng, scheduler=scheduler)
+        learner = ForgettingLearner(states_capitals, rng)
+        prompts[run_to_mastery(engine, learner)] += 1
+    return prompts
+
+
+def simulate(strategy, sessions, seed=0, workers=None):
+    """Histogram of prompts-to-mastery over all sessions."""
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, math.ceil(sessions / (workers * CHUNKS_PER_WORKER)))
+    starts = range(0, sessions, chunk)
+    counts = [min(chunk, sessions - start) for start in starts]
+
+    histogram = Counter()
+    if workers == 1:
+        for start, count in zip(starts, counts):
+            histogram.update(run_chunk(strategy, seed, start, count))
+        return histogram
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(run_chunk, [strategy] * len(counts), [seed] * len(counts),
+                             starts, counts):
+            histogram.update(part)
+    return histogram
+
+
+def distribution(histogram):
+    """Summary statistics of a {value: count} histogram."""
+    total = sum(histogram.values())
+    values = sorted(histogram)
+    mean = sum(v * c for v, c in histogram.items()) / total
+    variance = sum(c * (v - mean) ** 2 for v, c in histogram.items()) / total
+
+    def percentile(p):
+        rank = p / 100 * total
+        seen = 0
+        for value in values:
+            seen += histogram[value]
+            if seen >= rank:
+                return value
+        return values[-1]
+
+    return {
+        "sessions": total,
+        "mean": mean,
+        "stdev": math.sqrt(variance),
+        "min": values[0],
+        "p10": percentile(10),
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p99": percentile(99),
+        "max": values[-1],
+        "gave_up": histogram.get(MAX_PROMPTS, 0),
+    }
+
+
+def print_report(strategy, stats, elapsed):
+    print(f"{strategy}: {stats['sessions']} sessions in {elapsed:.1f}s "
+          f"({stats['sessions'] / elapsed:.0f} sessions/s)")
+    print(f"  prompts until all {len(states_capitals)} recalled at p >= {RECALL_TARGET}: "
+          f"mean {stats['mean']:.1f} "
+          f"(sd {stats['stdev']:.1f})")
+    print(f"  min {stats['min']}  p10 {stats['p10']}  p50 {stats['p50']}  "
+          f"p90 {stats['p90']}  p99 {stats['p99']}  max {stats['max']}")
+    if stats["gave_up"]:
+        print(f"  {stats['gave_up']} sessions hit the {MAX_PROMPTS}-prompt cap")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate forgetful learners taking the quiz.")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--strategy", choices=STRATEGIES + ("both",), default="both")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--scaling", action="store_true",
+                        help="time 1, 2, 4, ... workers up to --workers and report speedup")
+    args = parser.parse_args()
+
+    if args.scaling:
+        strategy = "leitner" if args.strategy == "both" else args.strategy
+        baseline = None
+        workers = 1
+        while workers <= args.workers:
+            start = time.perf_counter()
+            simulate(strategy, args.sessions, args.seed, workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:3d} workers: {elapsed:7.2f}s  speedup {baseline / elapsed:5.2f}x")
+            workers *= 2
+    else:
+        strategies = STRATEGIES if args.strategy == "both" else (args.strategy,)
+        for strategy in strategies:
+            start = time.perf_counter()
+            histogram = simulate(strategy, args.sessions, args.seed, args.workers)
+            print_report(strategy, distribution(histogram), time.perf_counter() - start)
@@ -0,0 +1,268 @@
+"""
+Cached, pre-scaled map image loading.
+
+Decoding the PNG map and rescaling it is the slowest part of starting the
+map version, so it is done once and the result is cached as a PPM file
+(raw pixels, no inflate step) keyed by the SHA-1 of the source image and
+the scale.  Later launches load the ready-made PPM straight into a
+PhotoImage.
+
+Hashing the file, and on a cache miss decoding the PNG, scaling it and
+writing the PPM, all happen on a worker thread while the quiz panel is
+already up and usable.  Decoding uses Pillow when it is installed and a
+small zlib-based reader for plain 8-bit PNGs otherwise; no Tk object is
+involved, because Tk objects must not be touched from other threads.  Only
+the final PhotoImage creation from the PPM runs on the Tk thread.  The
+worker hands its result back through a queue that is polled with `after`.
+
+StartupTimer records how long the window took to become interactive and
+how long the map took to appear; the map version prints it with
+--startup-times.
+"""
+import hashlib
+import os
+import queue
+import struct
+import threading
+import time
+import tkinter as tk
+import zlib
+
+try:
+    from PIL import Image
+except ImportError:     # optional; decode_png() handles the bundled map
+    Image = None
+
+# Map variants: scale -> (zoom, subsample) for PhotoImage
+SCALES = {
+    2.0: (2, 1),    # HiDPI displays
+    1.0: (1, 1),
+    0.5: (1, 2),    # small windows / low-resolution projectors
+}
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "state-capitals-quiz")
+
+
+def choose_scale(widget, width, height):
+    """
+    Pick the map variant for this display: 2x when Tk reports a HiDPI
+    scaling factor, half size when the full map would not fit the screen.
+    """
+    if float(widget.tk.call("tk", "scaling")) >= 2.5:
+        return 2.0
+    if width > widget.winfo_screenwidth() or height > widget.winfo_screenheight():
+        return 0.5
+    return 1.0
+
+
+def file_digest(path):
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _unfilter(raw, width, height, bpp):
+    """Undo the per-row PNG filters; returns the raw pixel bytes."""
+    stride = width * bpp
+    out = bytearray(stride * height)
+    prior = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        kind = raw[pos]
+        row = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += stride + 1
+        if kind == 1:       # Sub
+            for i in range(bpp, stride):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif kind == 2:     # Up
+            for i in range(stride):
+                row[i] = (row[i] + prior[i]) & 0xFF
+        elif kind == 3:     # Average
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prior[i]) >> 1)) & 0xFF
+        elif kind == 4:     # Paeth
+            for i in range(stride):
+                if i >= bpp:
+                    a, c = row[i - bpp], prior[i - bpp]
+                else:
+                    a = c = 0
+                b = prior[i]
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                if pa <= pb and pa <= pc:
+                    row[i] = (row[i] + a) & 0xFF
+                elif pb <= pc:
+                    row[i] = (row[i] + b) & 0xFF
+                else:
+                    row[i] = (row[i] + c) & 0xFF
+        elif kind != 0:
+            raise ValueError(f"bad PNG filter type {kind}")
+        out[y * stride:(y + 1) * stride] = row
+        prior = row
+    return out
+
+
+def decode_png(path):
+    """
+    Decode a non-interlaced 8-bit grey, RGB or RGBA PNG (alpha is dropped)
+    into (width, height, rgb_bytes) with the standard library only.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError(f"{path} is not a PNG file")
+    pos = 8
+    header = None
+    chunks = []
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            chunks.append(body)
+        elif kind == b"IEND":
+            break
+    width, height, depth, color, _, _, interlace = header
+    channels = {0: 1, 2: 3, 4: 2, 6: 4}.get(color)
+    if depth != 8 or channels is None or interlace:
+        raise ValueError(f"{path}: only plain 8-bit grey/RGB/RGBA PNGs are supported")
+
+    pixels = _unfilter(zlib.decompress(b"".join(chunks)), width, height, channels)
+    if channels == 3:
+        return width, height, bytes(pixels)
+    rgb = bytearray(width * height * 3)
+    if channels in (1, 2):       # grey (+ alpha)
+        grey = pixels[0::channels]
+        rgb[0::3] = rgb[1::3] = rgb[2::3] = grey
+    else:                        # RGBA
+        rgb[0::3], rgb[1::3], rgb[2::3] = pixels[0::4], pixels[1::4], pixels[2::4]
+    return width, height, bytes(rgb)
+
+
+def scale_rgb(width, height, rgb, zoom, subsample):
+    """Nearest-neighbour zoom/subsample, matching PhotoImage.zoom/subsample."""
+    stride = width * 3
+    rows = [rgb[y * stride:(y + 1) * stride] for y in range(height)]
+    if zoom != 1:
+        wide = []
+        for row in rows:
+            out = bytearray(len(row) * zoom)
+            for k in range(zoom):
+                for c in range(3):
+                    out[k * 3 + c::3 * zoom] = row[c::3]
+            wide.extend([bytes(out)] * zoom)
+        rows, width = wide, width * zoom
+    if subsample != 1:
+        narrow = []
+        for row in rows[::subsample]:
+            out = bytearray(len(row[::3][::subsample]) * 3)
+            for c in range(3):
+                out[c::3] = row[c::3][::subsample]
+            narrow.append(bytes(out))
+        rows, width = narrow, len(narrow[0]) // 3
+    return width, len(rows), b"".join(rows)
+
+
+def load_scaled_ppm(path, scale):
+    """Worker thread: the map at this scale as binary PPM bytes."""
+    if Image is not None:
+        image = Image.open(path).convert("RGB")
+        decoded = image.width, image.height, image.tobytes()
+    else:
+        decoded = decode_png(path)
+    width, height, rgb = scale_rgb(*decoded, *SCALES[scale])
+    return b"P6\n%d %d\n255\n" % (width, height) + rgb
+
+
+class MapAssetLoader:
+    def __init__(self, path, cache_dir=None):
+        self.path = path
+        self.cache_dir = cache_dir or default_cache_dir()
+        self._results = queue.Queue()
+
+    def cache_path(self, digest, scale):
+        return os.path.join(self.cache_dir, f"map-{digest[:16]}-{scale:g}x.ppm")
+
+    def load_async(self, widget, callback, scale=1.0):
+        """
+        Start loading the map at the given scale.  callback(image) runs on
+        the Tk thread with a PhotoImage, or with None if loading failed.
+        """
+        worker = threading.Thread(target=self._prepare, args=(scale,), daemon=True)
+        worker.start()
+        self._poll(widget, callback)
+
+    def _prepare(self, scale):
+        """
+        Worker thread: find or build the cached PPM.  Puts (cached_path,
+        None, None) when the file is ready, (None, ppm_bytes, None) when it
+        was decoded but could not be cached, or (None, None, error).
+        """
+        try:
+            cached = self.cache_path(file_digest(self.path), scale)
+            if os.path.exists(cached):
+                self._results.put((cached, None, None))
+                return
+            ppm = load_scaled_ppm(self.path, scale)
+        except (OSError, ValueError, zlib.error) as e:
+            self._results.put((None, None, e))
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{cached}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(ppm)
+            os.replace(tmp, cached)
+        except OSError as e:
+            print(f"Could not cache map image: {e}")  # still usable, just slower next time
+            self._results.put((None, ppm, None))
+            return
+        self._results.put((cached, None, None))
+
+    def _poll(self, widget, callback):
+        try:
+            cached, ppm, error = self._results.get_nowait()
+        except queue.Empty:
+            widget.after(10, self._poll, widget, callback)
+            return
+
+        if error is None:
+            try:
+                if cached is not None:
+                    image = tk.PhotoImage(master=widget, file=cached)
+                else:
+                    image = tk.PhotoImage(master=widget, data=ppm, format="ppm")
+            except tk.TclError as e:
+                error = e
+        if error is not None:
+            print(f"Could not load {self.path}: {error}")
+            callback(None)
+            return
+        callback(image)
+
+
+class StartupTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.start) * 1000
+
+    def mark_when_idle(self, widget, name):
+        """Record name once Tk has drawn everything queued so far."""
+        widget.after_idle(self.mark, name)
+
+    def report(self):
+        parts = [f"{name} {ms:.0f} ms" for name, ms in self.marks.items()]
+        print("Startup: " + ", ".join(parts))
@@ -0,0 +1,62 @@
+"""
+Which state's dot is under the mouse?
+
+DotLookup answers that with one list index.  The map is cut into small
+square cells and, up front, every cell is given the nearest dot within
+HIT_RADIUS (a nearest-dot Voronoi diagram, rasterised).  A <Motion> or
+click handler then turns (x, y) into a cell number and reads the answer,
+so hover highlighting costs the same however fast the mouse moves.
+
+Building the table only compares each cell with the dots in the
+neighbouring buckets of a coarse grid, so it stays quick for large maps
+too.  All coordinates are in unscaled map pixels; callers divide event
+coordinates by the map scale first.
+"""
+HIT_RADIUS = 40      # map pixels; clicks further than this from any dot miss
+CELL = 5             # lookup table resolution in map pixels
+_MISS = 0xFFFF
+
+
+class DotLookup:
+    def __init__(self, dots, width, height, radius=HIT_RADIUS, cell=CELL):
+        """dots maps key -> (x, y) in map pixels."""
+        self.keys = list(dots)
+        if len(self.keys) >= _MISS:
+            raise ValueError(f"at most {_MISS - 1} dots are supported")
+        self.cell = cell
+        self.cols = int(width // cell) + 1
+        self.rows = int(height // cell) + 1
+
+        # Bucket the dots on a grid as coarse as the radius, so each cell
+        # only needs to look at the 3x3 buckets around it
+        buckets = {}
+        for index, key in enumerate(self.keys):
+            x, y = dots[key]
+            buckets.setdefault((int(x // radius), int(y // radius)), []).append((x, y, index))
+
+        limit = radius * radius
+        table = [_MISS] * (self.cols * self.rows)
+        for row in range(self.rows):
+            cy = (row + 0.5) * cell
+            by = int(cy // radius)
+            for col in range(self.cols):
+                cx = (col + 0.5) * cell
+                bx = int(cx // radius)
+                best = limit
+                for gx in (bx - 1, bx, bx + 1):
+                    for gy in (by - 1, by, by + 1):
+                        for x, y, index in buckets.get((gx, gy), ()):
+                            d2 = (x - cx) ** 2 + (y - cy) ** 2
+                            if d2 <= best:
+                                best = d2
+                                table[row * self.cols + col] = index
+        self._table = table
+
+    def at(self, x, y):
+        """Key of the nearest dot to (x, y) within the hit radius, or None."""
+        col = int(x // self.cell)
+        row = int(y // self.cell)
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+        index = self._table[row * self.cols + col]
+        return None if index == _MISS else self.keys[index]
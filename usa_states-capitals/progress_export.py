@@ -0,0 +1,229 @@
+"""
+Printable progress maps, one per student, from the answer history logs.
+
+    python progress_export.py --out maps/                  # PNG (needs Pillow)
+    python progress_export.py --out maps/ --format ps      # PostScript via Tk
+
+Each map is the quiz map with a label on every capital that student has
+mastered (their last --streak answers for that state were all correct),
+at the same collision-free spots the map version reveals them at, plus the
+student's name and a count in the corner.
+
+Students' logs are spread over a process pool.  Each worker decodes the
+base map once, when it starts, and then only draws labels on top of it and
+writes the file for every student it is handed, so the cost per student
+is drawing ~50 labels and encoding one file.  Label positions are solved
+once in the parent and shared with every worker.
+
+PNG output, the default, uses Pillow and runs anywhere without tkinter;
+Pillow is optional and only needed for PNG.  PostScript output is opt-in:
+it uses a hidden Tk canvas and needs a display (or Xvfb), and its workers
+are spawned rather than forked, since a forked child must not inherit the
+Tk state of the parent (which measures label widths with its own root).
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from answer_history import default_log_dir
+from label_layout import solve_layout
+from state_data import (
+    LABEL_COLOR, LABEL_FONT, MAP_HEIGHT, MAP_IMAGE_FILE, MAP_WIDTH, get_state_position,
+    state_positions, states_capitals
+)
+
+FORMATS = ("png", "ps")
+TITLE_COLOR = "#1e3a8a"
+
+
+# ---------- Reading progress ----------
+
+def mastered_states(log_path, streak=1):
+    """(student name, set of mastered states) from one student's log."""
+    recent = {}     # state -> last `streak` results, newest last
+    student = None
+    with open(log_path, "rb") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # partial or corrupt line
+            student = event.get("student", student)
+            results = recent.setdefault(event.get("state"), [])
+            results.append(bool(event.get("correct")))
+            del results[:-streak]
+    if student is None:
+        student = os.path.splitext(os.path.basename(log_path))[0]
+    mastered = {
+        state for state, results in recent.items()
+        if state in states_capitals and len(results) == streak and all(results)
+    }
+    return student, mastered
+
+
+# ---------- Label layout ----------
+
+def label_positions(measure, line_height):
+    """Solve label spots exactly as the map version does, at scale 1."""
+    anchors = {}
+    extents = {}
+    for state in state_positions:
+        anchors[state] = get_state_position(state)
+        extents[state] = (measure(states_capitals[state]), line_height)
+    return solve_layout(anchors, extents, MAP_WIDTH, MAP_HEIGHT, LABEL_FONT)
+
+
+def _tk_metrics():
+    import tkinter as tk
+    import tkinter.font as tkfont
+    root = tk.Tk()
+    root.withdraw()
+    font = tkfont.Font(root=root, font=LABEL_FONT)
+    metrics = font.measure, font.metrics("linespace")
+    positions = label_positions(*metrics)
+    root.destroy()
+    return positions
+
+
+def _pil_font():
+    from PIL import ImageFont
+    family, size, *_ = LABEL_FONT
+    for name in ("DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf"):
+        try:
+            return ImageFont.truetype(name, int(size * 4 / 3))   # points -> pixels at 96 dpi
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+# ---------- Workers ----------
+
+_worker = {}
+
+
+def _init_worker(fmt, positions, out_dir):
+    """Decode the base map once per worker process."""
+    _worker.update(fmt=fmt, positions=positions, out_dir=out_dir)
+    if fmt == "png":
+        from PIL import Image
+        if os.path.exists(MAP_IMAGE_FILE):
+            base = Image.open(MAP_IMAGE_FILE).convert("RGB")
+        else:
+            base = Image.new("RGB", (MAP_WIDTH, MAP_HEIGHT), "#e0f2fe")
+        _worker.update(base=base, font=_pil_font())
+    else:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        canvas = tk.Canvas(
+            root, width=MAP_WIDTH, height=MAP_HEIGHT,
+            bg="#e0f2fe", highlightthickness=0
+        )
+        if os.path.exists(MAP_IMAGE_FILE):
+            image = tk.PhotoImage(master=root, file=MAP_IMAGE_FILE)
+            canvas.create_image(0, 0, anchor="nw", image=image)
+            _worker["image"] = image   # keep a reference or Tk frees it
+        _worker.update(root=root, canvas=canvas)
+
+
+def _output_path(student):
+    safe_name = re.sub(r"[^\w.-]+", "_", student)
+    return os.path.join(_worker["out_dir"], f"{safe_name}.{_worker['fmt']}")
+
+
+def _title(student, mastered):
+    return f"{student}: {len(mastered)}/{len(states_capitals)} capitals mastered"
+
+
+def _render_png(student, mastered, path):
+    from PIL import ImageDraw
+    image = _worker["base"].copy()
+    draw = ImageDraw.Draw(image)
+    font = _worker["font"]
+    for state in mastered:
+        x, y = _worker["positions"][state]
+        draw.text((x, y), states_capitals[state], font=font, fill=LABEL_COLOR)
+    draw.text((10, 10), _title(student, mastered), font=font, fill=TITLE_COLOR)
+    image.save(path, compress_level=1)   # fast; maps are mostly flat colour anyway
+
+
+def _render_ps(student, mastered, path):
+    canvas = _worker["canvas"]
+    for state in mastered:
+        x, y = _worker["positions"][state]
+        canvas.create_text(
+            x, y, text=states_capitals[state], anchor="nw",
+            font=LABEL_FONT, fill=LABEL_COLOR, tags="student"
+        )
+    canvas.create_text(
+        10, 10, text=_title(student, mastered), anchor="nw",
+        font=("Helvetica", 14, "bold"), fill=TITLE_COLOR, tags="student"
+    )
+    canvas.postscript(
+        file=path, x=0, y=0, width=MAP_WIDTH, height=MAP_HEIGHT,
+        colormode="color", pagewidth="10i"
+    )
+    canvas.delete("student")   # back to the bare map for the next student
+
+
+def export_one(log_path, streak):
+    student, mastered = mastered_states(log_path, streak)
+    path = _output_path(student)
+    if _worker["fmt"] == "png":
+        _render_png(student, mastered, path)
+    else:
+        _render_ps(student, mastered, path)
+    return student, len(mastered), path
+
+
+def export_all(log_paths, out_dir, fmt="png", streak=1, workers=None):
+    """Render every log's map; returns [(student, mastered count, path)]."""
+    if fmt == "png":
+        try:
+            import PIL  # noqa: F401  (optional dependency, only for PNG)
+        except ImportError:
+            raise SystemExit("PNG export needs Pillow (pip install pillow); or use --format ps")
+        font = _pil_font()
+        positions = label_positions(lambda text: font.getlength(text), sum(font.getmetrics()))
+    else:
+        positions = _tk_metrics()
+
+    os.makedirs(out_dir, exist_ok=True)
+    # Tk workers start clean; never fork a process that has had a Tk root
+    context = multiprocessing.get_context("spawn") if fmt == "ps" else None
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context,
+        initializer=_init_worker, initargs=(fmt, positions, out_dir)
+    ) as pool:
+        chunksize = max(1, len(log_paths) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(export_one, log_paths, [streak] * len(log_paths), chunksize=chunksize))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a progress map for every student.")
+    parser.add_argument("--log-dir", default=default_log_dir())
+    parser.add_argument("--out", default="progress-maps", help="folder to write maps to")
+    parser.add_argument("--format", choices=FORMATS, default="png",
+                        help="png (default, needs Pillow) or ps (needs a Tk display)")
+    parser.add_argument("--streak", type=int, default=1,
+                        help="correct answers in a row that count as mastered (default 1)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    logs = sorted(glob.glob(os.path.join(args.log_dir, "*.jsonl")))
+    if not logs:
+        sys.exit(f"No answer history in {args.log_dir}")
+
+    start = time.perf_counter()
+    try:
+        results = export_all(logs, args.out, args.format, args.streak, args.workers)
+    except Exception as e:   # e.g. TclError: no display for PostScript
+        sys.exit(f"Export failed: {e}")
+    elapsed = time.perf_counter() - start
+    print(f"Exported {len(results)} maps to {args.out} in {elapsed:.1f}s")
@@ -0,0 +1,417 @@
+"""
+Question banks: an editable JSON source format plus a compiled,
+memory-mapped binary form with prebuilt lookup indexes.
+
+Source (.json), versioned by the "format" and "version" keys:
+
+    {
+      "format": "state-capitals-quiz/question-bank",
+      "version": 1,
+      "name": "U.S. state capitals",
+      "prompt_label": "state", "answer_label": "capital",
+      "fact_fields": ["flower", "bird"],
+      "map": {"image": "usa_map.png", "width": 940, "height": 680},
+      "regions": ["West", ...],
+      "entries": [
+        {"prompt": "Alabama", "answer": "Montgomery", "region": "South",
+         "facts": {"flower": "Camellia", "bird": "Yellowhammer"},
+         "position": [650, 445], "offset": [-35, -5]},
+        ...
+      ]
+    }
+
+"position" is the label anchor on the map in map pixels and "offset" the
+hand-tuned (dx, dy) nudge; both are optional for banks without a map.
+
+Compiled (.qbank), little-endian:
+
+    header   magic, format version, entry/field counts, source size and
+             mtime (to detect a stale compile), section offsets
+    meta     the JSON source minus "entries" (name, labels, map, ...)
+    entries  one fixed-size record per entry: (offset, length) into the
+             string table for every string field, then x, y, dx, dy
+    indexes  entry numbers sorted by normalized prompt and by normalized
+             answer, for binary-search lookups in both directions
+    strings  every string, UTF-8, back to back
+
+load_bank() compiles a .json source the first time (or whenever it
+changes) and afterwards just memory-maps the .qbank file.  Opening a
+40,000-entry bank then costs a few milliseconds; entries are decoded only
+when they are read.  The compiled file goes to the per-user cache folder
+(~/.cache/state-capitals-quiz/banks, or a per-user folder under the temp
+dir if that isn't writable), never next to the source; a fresh .qbank
+that `compile` put next to the source, e.g. in an install, is used as is.
+
+    python question_bank.py compile banks/*.json
+    python question_bank.py bench --entries 40000
+"""
+import argparse
+import getpass
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+from answer_matching import normalize
+
+FORMAT = "state-capitals-quiz/question-bank"
+SOURCE_VERSION = 1
+MAGIC = b"QBNK"
+COMPILED_VERSION = 1
+
+BANK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "banks")
+US_CAPITALS = os.path.join(BANK_DIR, "us_capitals.json")
+
+# magic, version, entry count, string fields per entry, source size,
+# source mtime_ns, then offsets of meta/entries/prompt index/answer index/strings
+_HEADER = struct.Struct("<4sHHIqq5I")
+# Fixed string fields before the bank's own fact fields
+_BASE_FIELDS = ("prompt", "answer", "region", "norm_prompt", "norm_answer")
+_INDEX = struct.Struct("<I")
+
+
+class BankFormatError(ValueError):
+    pass
+
+
+# ---------- Compiling ----------
+
+def read_source(path):
+    with open(path, encoding="utf-8") as f:
+        source = json.load(f)
+    if source.get("format") != FORMAT:
+        raise BankFormatError(f"{path} is not a question bank")
+    if source.get("version") != SOURCE_VERSION:
+        raise BankFormatError(
+            f"{path} is question-bank version {source.get('version')}, expected {SOURCE_VERSION}"
+        )
+    return source
+
+
+def compile_bank(source_path, out_path=None):
+    """Compile a .json bank to its .qbank form and return the output path."""
+    out_path = out_path or compiled_path(source_path)
+    source = read_source(source_path)
+    entries = source["entries"]
+    fact_fields = list(source.get("fact_fields", ()))
+    fields = _BASE_FIELDS + tuple(fact_fields)
+    meta = {k: v for k, v in source.items() if k != "entries"}
+    meta["fact_fields"] = fact_fields
+
+    strings = bytearray()
+    seen = {}
+
+    def intern(text):
+        """Store each distinct string once; return its (offset, length)."""
+        data = text.encode("utf-8")
+        span = seen.get(data)
+        if span is None:
+            span = seen[data] = (len(strings), len(data))
+            strings.extend(data)
+        return span
+
+    record = struct.Struct("<" + "II" * len(fields) + "ffff")
+    records = bytearray()
+    norm_prompts = []
+    norm_answers = []
+    for entry in entries:
+        facts = entry.get("facts", {})
+        norm_prompt = normalize(entry["prompt"])
+        norm_answer = normalize(entry["answer"])
+        norm_prompts.append(norm_prompt)
+        norm_answers.append(norm_answer)
+        values = [entry["prompt"], entry["answer"], entry.get("region", ""), norm_prompt, norm_answer]
+        values += [str(facts.get(name, "")) for name in fact_fields]
+        spans = []
+        for value in values:
+            spans.extend(intern(value))
+        x, y = entry.get("position", (0, 0))
+        dx, dy = entry.get("offset", (0, 0))
+        records.extend(record.pack(*spans, x, y, dx, dy))
+
+    prompt_index = sorted(range(len(entries)), key=norm_prompts.__getitem__)
+    answer_index = sorted(range(len(entries)), key=norm_answers.__getitem__)
+
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    meta_off = _HEADER.size
+    entries_off = meta_off + len(meta_bytes)
+    prompts_off = entries_off + len(records)
+    answers_off = prompts_off + _INDEX.size * len(entries)
+    strings_off = answers_off + _INDEX.size * len(entries)
+
+    stat = os.stat(source_path)
+    header = _HEADER.pack(
+        MAGIC, COMPILED_VERSION, len(fields), len(entries), stat.st_size, stat.st_mtime_ns,
+        meta_off, entries_off, prompts_off, answers_off, strings_off
+    )
+
+    directory = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.write(records)
+        f.write(struct.pack(f"<{len(entries)}I", *prompt_index))
+        f.write(struct.pack(f"<{len(entries)}I", *answer_index))
+        f.write(strings)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def compiled_path(source_path):
+    """Where the compile command writes: next to the source."""
+    return os.path.splitext(source_path)[0] + ".qbank"
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "state-capitals-quiz", "banks")
+
+
+def _user_temp_dir():
+    """Fallback cache: a temp folder of this user's own, so users never collide."""
+    user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), f"state-capitals-quiz-{user}")
+
+
+def cached_path(source_path, cache_dir):
+    """Compiled file for a source in cache_dir; the path hash keeps same-named banks apart."""
+    source_path = os.path.abspath(source_path)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    digest = hashlib.sha1(source_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{stem}-{digest}.qbank")
+
+
+# ---------- Loading ----------
+
+class QuestionBank:
+    """Read-only view over a memory-mapped .qbank file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, nfields, count, self.source_size, self.source_mtime_ns,
+         meta_off, self._entries_off, self._prompts_off, self._answers_off,
+         self._strings_off) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != COMPILED_VERSION:
+            self._map.close()
+            raise BankFormatError(f"{path} is not a compiled version {COMPILED_VERSION} bank")
+
+        self.meta = json.loads(self._map[meta_off:self._entries_off].decode("utf-8"))
+        self.fact_fields = tuple(self.meta.get("fact_fields", ()))
+        self.fields = _BASE_FIELDS + self.fact_fields
+        self._count = count
+        self._record = struct.Struct("<" + "II" * nfields + "ffff")
+        self._field_pos = {name: i for i, name in enumerate(self.fields)}
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._map.close()
+
+    # ---------- Entry access ----------
+
+    def _string(self, i, field):
+        pos = self._entries_off + i * self._record.size + 8 * self._field_pos[field]
+        offset, length = struct.unpack_from("<II", self._map, pos)
+        start = self._strings_off + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def prompt(self, i):
+        return self._string(i, "prompt")
+
+    def answer(self, i):
+        return self._string(i, "answer")
+
+    def entry(self, i):
+        """Decode one entry as a dict shaped like the JSON source."""
+        values = self._record.unpack_from(self._map, self._entries_off + i * self._record.size)
+        strings = []
+        for n in range(len(self.fields)):
+            start = self._strings_off + values[2 * n]
+            strings.append(self._map[start:start + values[2 * n + 1]].decode("utf-8"))
+        x, y, dx, dy = values[-4:]
+        return {
+            "prompt": strings[0],
+            "answer": strings[1],
+            "region": strings[2],
+            "facts": dict(zip(self.fact_fields, strings[len(_BASE_FIELDS):])),
+            "position": (x, y),
+            "offset": (dx, dy),
+        }
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self.entry(i)
+
+    # ---------- Index lookups ----------
+
+    def _search(self, index_off, field, key):
+        """First slot in a sorted index whose normalized field is >= key."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = _INDEX.unpack_from(self._map, index_off + mid * _INDEX.size)[0]
+            if self._string(i, field) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _matches(self, index_off, field, key):
+        slot = self._search(index_off, field, key)
+        found = []
+        while slot < self._count:
+            i = _INDEX.unpack_from(self._map, index_off + slot * _INDEX.size)[0]
+            if self._string(i, field) != key:
+                break
+            found.append(i)
+            slot += 1
+        return found
+
+    def find(self, prompt):
+        """Entry number for a prompt (case/punctuation-insensitive), or None."""
+        found = self._matches(self._prompts_off, "norm_prompt", normalize(prompt))
+        return found[0] if found else None
+
+    def prompts_for_answer(self, answer):
+        """Every prompt whose answer matches (e.g. shared capitals or birds)."""
+        return [self.prompt(i) for i in self._matches(self._answers_off, "norm_answer", normalize(answer))]
+
+    # ---------- Whole-bank views ----------
+
+    def answers(self):
+        """prompt -> answer, in bank order (the shape of states_capitals)."""
+        return {e["prompt"]: e["answer"] for e in self}
+
+    def facts(self):
+        """prompt -> tuple of fact values in fact_fields order."""
+        return {e["prompt"]: tuple(e["facts"][name] for name in self.fact_fields) for e in self}
+
+    def positions(self):
+        return {e["prompt"]: e["position"] for e in self}
+
+    def offsets(self):
+        return {e["prompt"]: e["offset"] for e in self if e["offset"] != (0, 0)}
+
+    def regions(self):
+        """region -> tuple of prompts, in the bank's region order."""
+        grouped = {name: [] for name in self.meta.get("regions", ())}
+        for e in self:
+            if e["region"]:
+                grouped.setdefault(e["region"], []).append(e["prompt"])
+        return {name: tuple(prompts) for name, prompts in grouped.items()}
+
+
+def _open_fresh(target, stat):
+    """The compiled bank at target if it matches the source's stat, else None."""
+    if not os.path.exists(target):
+        return None
+    try:
+        bank = QuestionBank(target)
+    except (OSError, BankFormatError, struct.error, ValueError):
+        return None     # damaged compile: rebuild
+    if (bank.source_size, bank.source_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+        return bank
+    bank.close()
+    return None
+
+
+def load_bank(path=US_CAPITALS, cache_dir=None):
+    """
+    Open a question bank.  A .json source is compiled on first use, into
+    cache_dir (default: the per-user cache), and recompiled whenever it
+    changes; a .qbank file is opened directly.
+    """
+    if not path.endswith(".json"):
+        return QuestionBank(path)
+
+    stat = os.stat(path)
+    bank = _open_fresh(compiled_path(path), stat)
+    if bank is not None:
+        return bank
+
+    error = None
+    for folder in (cache_dir or default_cache_dir(), _user_temp_dir()):
+        target = cached_path(path, folder)
+        bank = _open_fresh(target, stat)
+        if bank is not None:
+            return bank
+        try:
+            os.makedirs(folder, mode=0o700, exist_ok=True)
+            compile_bank(path, target)
+        except OSError as e:
+            error = e   # e.g. no writable home: try the next folder
+            continue
+        return QuestionBank(target)
+    raise error
+
+
+# ---------- Command line ----------
+
+def _bench(entries):
+    """Time compiling and opening a synthetic bank of the given size."""
+    source = {
+        "format": FORMAT,
+        "version": SOURCE_VERSION,
+        "name": f"synthetic {entries}",
+        "fact_fields": ["country"],
+        "entries": [
+            {"prompt": f"City {n:05d}", "answer": f"Answer {n % 9973}",
+             "facts": {"country": f"Country {n % 200}"}, "position": [n % 900, n % 600]}
+            for n in range(entries)
+        ],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(source, f)
+
+        start = time.perf_counter()
+        with open(path, encoding="utf-8") as f:
+            json.load(f)
+        parse_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        compile_bank(path)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        bank = load_bank(path)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for n in range(0, entries, max(1, entries // 1000)):
+            bank.find(f"city {n:05d}")
+        find_us = (time.perf_counter() - start) * 1_000_000 / min(entries, 1000)
+        bank.close()
+
+    print(f"{entries} entries: parse JSON {parse_ms:.1f} ms, compile {compile_ms:.1f} ms, "
+          f"open compiled {open_ms:.2f} ms, find {find_us:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile and inspect question banks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_cmd = commands.add_parser("compile", help="compile .json banks to .qbank")
+    compile_cmd.add_argument("sources", nargs="+")
+    bench_cmd = commands.add_parser("bench", help="time loading a synthetic bank")
+    bench_cmd.add_argument("--entries", type=int, default=40000)
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        for source_path in args.sources:
+            try:
+                out = compile_bank(source_path)
+            except (OSError, ValueError) as e:
+                print(f"{source_path}: {e}", file=sys.stderr)
+                continue
+            print(f"{source_path} -> {out}")
+    else:
+        _bench(args.entries)
@@ -0,0 +1,125 @@
+"""
+Question types beyond "what is the capital of this state?".
+
+Each type is a plain prompt -> answer(s) mapping that QuizEngine and
+AnswerIndex take as is:
+
+    state-capital   state -> capital
+    capital-state   capital -> state
+    bird-state      state bird -> every state with that bird
+    flower-state    state flower -> every state with that flower
+
+The reverse types are inverted indexes built once, at import, in one pass
+over the data.  Several states often share an answer (seven have the
+Northern cardinal), so an inverted prompt maps to a tuple of every state
+that has it; any of them is accepted, and AnswerIndex grades it as a
+set-membership check.  Asking is the engine's O(1) pool draw whatever the
+type, and QuestionSet puts several types in one pool keyed by
+(type, prompt) so mixed quizzes stay O(1) too.
+"""
+from state_data import state_facts, states_capitals
+
+MIXED = "mixed"
+
+
+def inverted(mapping):
+    """value -> tuple of keys with that value, in the mapping's order."""
+    index = {}
+    for key, value in mapping.items():
+        index.setdefault(value, []).append(key)
+    return {value: tuple(keys) for value, keys in index.items()}
+
+
+def join_answers(answers):
+    """'Ohio' / 'Indiana and Ohio' / 'Illinois, Indiana and Ohio'."""
+    if isinstance(answers, str):
+        return answers
+    if len(answers) == 1:
+        return answers[0]
+    return f"{', '.join(answers[:-1])} and {answers[-1]}"
+
+
+class QuestionType:
+    def __init__(self, key, topic, question, statement, items):
+        """
+        key:       name used on the command line
+        topic:     what is being learned, for "all 50 {topic}" messages
+        question:  text shown above the prompt
+        statement: the fact shown after an answer, with {prompt}/{answer}
+        items:     prompt -> answer, or -> tuple of accepted answers
+        """
+        self.key = key
+        self.topic = topic
+        self.question = question
+        self.statement = statement
+        self.items = items
+
+    def describe(self, prompt):
+        """The full fact for a prompt, e.g. 'The capital of Ohio is Columbus.'"""
+        return self.statement.format(prompt=prompt, answer=join_answers(self.items[prompt]))
+
+
+def build_question_types():
+    flowers = {state: flower for state, (flower, _bird) in state_facts.items()}
+    birds = {state: bird for state, (_flower, bird) in state_facts.items()}
+    types = (
+        QuestionType(
+            "state-capital", "state capitals", "Guess the capital of the state:",
+            "The capital of {prompt} is {answer}.", states_capitals
+        ),
+        QuestionType(
+            "capital-state", "capitals", "Which state has this capital?",
+            "{prompt} is the capital of {answer}.", inverted(states_capitals)
+        ),
+        QuestionType(
+            "bird-state", "state birds", "Name a state whose state bird is:",
+            "The {prompt} is the state bird of {answer}.", inverted(birds)
+        ),
+        QuestionType(
+            "flower-state", "state flowers", "Name a state whose state flower is:",
+            "{prompt} is the state flower of {answer}.", inverted(flowers)
+        ),
+    )
+    return {question_type.key: question_type for question_type in types}
+
+
+QUESTION_TYPES = build_question_types()
+DEFAULT_TYPE = "state-capital"
+
+
+class QuestionSet:
+    """One question type, or several mixed into one prompt -> answer(s) mapping."""
+
+    def __init__(self, keys=(DEFAULT_TYPE,)):
+        self.types = [QUESTION_TYPES[key] for key in keys]
+        self.mixed = len(self.types) > 1
+        if self.mixed:
+            self.items = {
+                (question_type.key, prompt): answer
+                for question_type in self.types
+                for prompt, answer in question_type.items.items()
+            }
+            self.topic = "questions"
+        else:
+            self.items = self.types[0].items
+            self.topic = self.types[0].topic
+
+    @classmethod
+    def named(cls, key):
+        """A single type by key, or every type for MIXED."""
+        return cls(tuple(QUESTION_TYPES) if key == MIXED else (key,))
+
+    def split(self, item):
+        """(QuestionType, prompt) for an engine item."""
+        if self.mixed:
+            key, prompt = item
+            return QUESTION_TYPES[key], prompt
+        return self.types[0], item
+
+    def answers(self):
+        """Every distinct answer, e.g. for autocomplete."""
+        seen = {}
+        for answer in self.items.values():
+            for one in (answer if isinstance(answer, tuple) else (answer,)):
+                seen.setdefault(one)
+        return list(seen)
@@ -0,0 +1,173 @@
+"""
+Headless quiz engine shared by both Tk front-ends.
+
+The engine owns the quiz rules (which state is asked, how answers are
+graded, score keeping) and never touches tkinter, so it can run tens of
+thousands of simulated sessions per second in tests or on a server.
+
+States still in play live in an index-swap pool: the live states occupy
+pool[:live] and every state remembers its own slot.  Drawing a random
+state is a single index into that prefix, and retiring a state swaps it
+with the last live slot and shrinks the prefix, so both are O(1) and no
+list is rebuilt between questions.
+
+An optional scheduler (see scheduler.py) can take over choosing the next
+state; the engine then reports every graded answer back to it, along with
+how long the learner took to answer.  Those response times are also kept
+per state in `latency` (see latency.py).
+"""
+import random
+import time
+
+from answer_matching import AnswerIndex
+from latency import SKIPPED, LatencyTracker
+
+
+class QuizEngine:
+    def __init__(self, items, retire_correct=True, rng=None, scheduler=None, clock=None,
+                 bank=None):
+        """
+        items:          mapping of prompt (state) -> answer (capital)
+        retire_correct: drop a state from the pool once it is answered
+                        correctly (simple version) or keep asking every
+                        state forever (map version); ignored when a
+                        scheduler is given, which retires mastered states
+        rng:            a random.Random-like object; defaults to a fresh one
+        scheduler:      optional object with next_item()/record()/skip()
+                        that decides the question order instead of
+                        uniform random picking
+        clock:          seconds-returning timer used for response times;
+                        defaults to time.perf_counter (replay.py passes a
+                        virtual clock so replayed sessions time identically)
+        bank:           the QuestionBank items came from (items ==
+                        bank.answers()), to grade with its prebuilt indexes
+        """
+        self.items = items
+        self.retire_correct = retire_correct
+        self.rng = rng if rng is not None else random.Random()
+        self.scheduler = scheduler
+        self.clock = clock if clock is not None else time.perf_counter
+        self.matcher = AnswerIndex(items, bank)
+        self.last_result = None   # MatchResult of the most recent grade
+        self.asked_at = None      # clock() when the current state was asked
+        self.last_response_ms = None
+        self.latency = LatencyTracker()
+
+        self._names = list(items)
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self._pool = list(range(len(self._names)))   # pool[:live] are in play
+        self._slot = list(range(len(self._names)))   # item index -> pool slot
+        self._live = len(self._names)
+
+        self.score = 0
+        self.total_questions = 0
+        self.state = None
+        self._prefetched = None   # next state, chosen early by prefetch()
+
+    # ---------- Pool bookkeeping ----------
+
+    @property
+    def remaining(self):
+        """Number of states still in play."""
+        return self._live
+
+    def is_done(self):
+        return self._live == 0
+
+    def is_live(self, state):
+        return self._slot[self._index[state]] < self._live
+
+    def retire(self, state):
+        """Take a state out of play in O(1) by swapping it past the live prefix."""
+        i = self._index[state]
+        slot = self._slot[i]
+        last = self._live - 1
+        if slot > last:
+            return  # already retired
+
+        j = self._pool[last]
+        self._pool[slot] = j
+        self._pool[last] = i
+        self._slot[j] = slot
+        self._slot[i] = last
+        self._live = last
+
+    def set_retired(self, states):
+        """
+        Put exactly these states out of play, rebuilding the pool in a
+        canonical order: two engines given the same set (and the same RNG
+        state) then ask the same questions, which lets saved sessions resume.
+        """
+        self._pool = list(range(len(self._names)))
+        self._slot = list(range(len(self._names)))
+        self._live = len(self._names)
+        self._prefetched = None
+        for state in states:
+            self.retire(state)
+
+    # ---------- Quiz rules ----------
+
+    def _pick(self):
+        if self._live == 0:
+            return None
+        if self.scheduler is not None:
+            return self.scheduler.next_item()
+        return self._names[self._pool[int(self.rng.random() * self._live)]]
+
+    def prefetch(self):
+        """
+        Choose the next state ahead of time, e.g. while feedback for the
+        current one is still showing.  The current state and its timer are
+        untouched; the following next_question() returns this state.
+        """
+        self._prefetched = self._pick()
+        return self._prefetched
+
+    def next_question(self):
+        """Pick the next state to ask, or None once every state is retired."""
+        state, self._prefetched = self._prefetched, None
+        if state is None or not self.is_live(state):
+            state = self._pick()
+        self.state = state
+        if state is not None:
+            self.asked_at = self.clock()
+        return state
+
+    def skip(self):
+        """Skip the current state without grading it."""
+        if self.state is None:
+            return
+        self._prefetched = None
+        self.last_response_ms = (self.clock() - self.asked_at) * 1000
+        self.latency.record(self.state, self.last_response_ms, SKIPPED)
+        if self.scheduler is not None:
+            self.scheduler.skip(self.state)
+
+    def correct_answer(self, state=None):
+        return self.items[state if state is not None else self.state]
+
+    def check_answer(self, answer):
+        """
+        Grade an answer for the current state and update the score.
+        Returns True when the answer is correct or close enough; the full
+        MatchResult is kept in last_result for feedback.
+        """
+        if self.state is None:
+            return False
+
+        self._prefetched = None   # grading can change what should come next
+        self.total_questions += 1
+        self.last_response_ms = (self.clock() - self.asked_at) * 1000
+        self.latency.record(self.state, self.last_response_ms)
+        self.last_result = self.matcher.grade(self.state, answer)
+        correct = self.last_result.accepted
+        if correct:
+            self.score += 1
+
+        if self.scheduler is not None:
+            # The scheduler decides when a state has been learned well enough
+            if self.scheduler.record(self.state, correct, self.last_response_ms):
+                self.retire(self.state)
+        elif correct and self.retire_correct:
+            self.retire(self.state)
+        return correct
@@ -0,0 +1,228 @@
+"""
+Recorded quiz sessions and headless replay.
+
+Started with --record FILE, either GUI writes every input it acts on as
+one JSON line: the answers, skips and facts requests, and the timer
+firings (the map version's feedback -> next question timer and its
+speed-round ticks).
+
+    {"t": 0, "type": "start", "gui": "map", "seed": 1234, "options": {...}}
+    {"t": 2140.5, "type": "answer", "asked": "Ohio", "answer": "Columbus"}
+    {"t": 3341.2, "type": "advance", "asked": "Ohio"}
+    ...
+    {"t": 95012.0, "type": "close", "asked": "Utah", "score": 31, "total": 40}
+
+Each GUI draws from one random.Random seeded with its --seed (or a fresh
+seed, which is recorded), and while recording the engine reads the time
+from the recorder, so response times are the event timestamps.  That
+makes a session a pure function of its first line and its inputs:
+replay() rebuilds the engine headlessly, feeds the events back on a
+virtual clock at full speed, and checks at every event that the replay is
+asking the same question the learner saw, and at the end that the score
+matches.
+
+    python replay.py lab-session.jsonl --repeat 1000
+
+re-runs a classroom session a thousand times as a regression test (exit
+status 1 if it diverges) and reports events replayed per second.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from distractors import distractor_table
+from question_types import DEFAULT_TYPE, QuestionSet
+from quiz_engine import QuizEngine
+from scheduler import LeitnerScheduler
+from session_state import ItemBits, SessionState
+from state_data import bank, state_positions, states_capitals
+
+SIMPLE = "simple"   # us_state_capitals_tk.py
+MAP = "map"         # usa_states-capitals.py
+
+# Mirrors of the map version's quiz phases
+PROMPTING = "prompting"
+FEEDBACK = "feedback"
+FINISHED = "finished"
+
+
+class ReplayError(Exception):
+    """The replayed session did not do what the recorded one did."""
+
+
+def new_seed():
+    """A fresh 64-bit seed that doesn't touch the global random state."""
+    return int.from_bytes(os.urandom(8), "little")
+
+
+class EventRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.events = []
+        self.engine = None
+        self.now = 0.0      # seconds since start, as of the latest event
+        self._started_at = time.perf_counter()
+
+    def clock(self):
+        """Engine clock while recording: the time of the event being handled."""
+        return self.now
+
+    def start(self, engine, gui, seed, options, session=None):
+        """First line: everything needed to rebuild the engine."""
+        self.engine = engine
+        self.events.append({
+            "t": 0, "type": "start", "gui": gui, "seed": seed, "options": options,
+            "session": None if session is None else session.to_bytes().hex(),
+        })
+
+    def event(self, kind, **fields):
+        """Record one input, stamped with the question that was showing."""
+        t = round((time.perf_counter() - self._started_at) * 1000, 3)
+        self.now = t / 1000
+        self.events.append({"t": t, "type": kind, "asked": self.engine.state, **fields})
+
+    def close(self):
+        self.event("close", score=self.engine.score, total=self.engine.total_questions)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            for event in self.events:
+                f.write(json.dumps(event) + "\n")
+
+
+def load_events(path):
+    with open(path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    if not events or events[0].get("type") != "start":
+        raise ReplayError(f"{path} is not a recorded session")
+    return events
+
+
+def _item(value):
+    """Engine item from JSON (mixed-question items are (type, prompt) tuples)."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+class HeadlessQuiz:
+    """
+    The engine side of either GUI, driven by recorded inputs.  Every
+    handler makes the same engine calls, in the same order, as the GUI
+    method it stands in for.
+    """
+
+    def __init__(self, start):
+        options = start["options"]
+        self.gui = start["gui"]
+        self.rapid = options.get("rapid", False)
+        self.round_seconds = options.get("round_seconds")
+        self.now = 0.0
+        self.phase = PROMPTING
+        self.facts_shown = 0
+
+        rng = self.rng = random.Random(start["seed"])
+        source = None   # the bank items came from, if all of it
+        if self.gui == MAP:
+            items, source = states_capitals, bank
+        else:
+            items = QuestionSet.named(options.get("ask", DEFAULT_TYPE)).items
+        scheduler = LeitnerScheduler(items, rng=rng) if options.get("spaced") else None
+        self.engine = QuizEngine(
+            items, retire_correct=self.gui == SIMPLE, rng=rng, scheduler=scheduler,
+            clock=lambda: self.now, bank=source
+        )
+        self.distractors = None
+        if options.get("choices"):
+            self.distractors = distractor_table(states_capitals, state_positions)
+        if start.get("session"):
+            saved = SessionState.from_bytes(bytes.fromhex(start["session"]), ItemBits(items))
+            saved.apply(self.engine)
+
+        self.handlers = {
+            "answer": self.answer,
+            "skip": self.skip,
+            "facts": self.facts,
+            "advance": self.advance,
+            "tick": self.tick,
+            "close": self.close,
+        }
+        self.next_question()
+
+    def next_question(self):
+        self.phase = PROMPTING
+        item = self.engine.next_question()
+        if item is not None and self.distractors is not None:
+            self.distractors.choices(item, n=4, rng=self.rng)
+
+    def _show_feedback(self):
+        if self.gui == SIMPLE or self.rapid:
+            self.next_question()
+            return
+        self.phase = FEEDBACK
+        self.engine.prefetch()
+
+    def answer(self, event):
+        self.engine.check_answer(event["answer"])
+        self._show_feedback()
+
+    def skip(self, event):
+        if self.phase == FEEDBACK:
+            self.advance(event)
+            return
+        self.engine.skip()
+        self._show_feedback()
+
+    def facts(self, event):
+        self.facts_shown += 1   # the panel is display only; the engine isn't touched
+
+    def advance(self, event):
+        self.next_question()
+
+    def tick(self, event):
+        if event["elapsed"] >= self.round_seconds:
+            self.phase = FINISHED
+
+    def close(self, event):
+        result = (self.engine.score, self.engine.total_questions)
+        if result != (event["score"], event["total"]):
+            raise ReplayError(
+                f"session ended {event['score']}/{event['total']} "
+                f"but the replay ended {result[0]}/{result[1]}"
+            )
+
+
+def replay(events):
+    """Re-run a recorded session headlessly; returns the finished HeadlessQuiz."""
+    quiz = HeadlessQuiz(events[0])
+    for n, event in enumerate(events[1:], start=2):
+        quiz.now = event["t"] / 1000
+        asked = _item(event["asked"])
+        if asked != quiz.engine.state:
+            raise ReplayError(
+                f"line {n} ({event['type']}): the learner saw {asked!r} "
+                f"but the replay is asking {quiz.engine.state!r}"
+            )
+        quiz.handlers[event["type"]](event)
+    return quiz
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded quiz session headlessly.")
+    parser.add_argument("session", help="file written by a GUI's --record")
+    parser.add_argument("--repeat", type=int, default=1, help="replay it this many times")
+    args = parser.parse_args()
+
+    events = load_events(args.session)
+    start = time.perf_counter()
+    try:
+        for _ in range(args.repeat):
+            quiz = replay(events)
+    except ReplayError as e:
+        sys.exit(f"Replay diverged: {e}")
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(events)} events, score {quiz.engine.score}/{quiz.engine.total_questions}")
+    print(f"{args.repeat} replays in {elapsed:.2f}s "
+          f"({elapsed / args.repeat * 1000:.3f} ms each, "
+          f"{len(events) * args.repeat / elapsed:,.0f} events/s)")
@@ -0,0 +1,193 @@
+"""
+Spaced-repetition scheduling for the quiz engine.
+
+LeitnerScheduler keeps every state in a box.  A correct answer moves the
+state up one box and pushes its next review further out; a wrong answer
+sends it back to the first box so it comes up again soon.  A state that
+is answered correctly while in the last box is mastered and leaves the
+rotation.
+
+Reviews are ordered by a heap of (due, seq, item) so the next due state is
+found in O(1) and rescheduled in O(log n).  The clock is the number of
+prompts answered, not wall time, so the behaviour is the same in the GUI,
+on a server, or in a simulation.
+
+Run this module directly to compare the scheduler against the uniform
+random.choice picking the map version used before:
+
+    python scheduler.py --sessions 200
+"""
+import argparse
+import heapq
+import random
+
+from quiz_engine import QuizEngine
+from state_data import states_capitals
+
+# Prompts to wait before asking again, per box
+DEFAULT_INTERVALS = (1, 4, 10, 24)
+# A correct answer slower than this doesn't earn a promotion
+DEFAULT_SLOW_MS = 8000
+
+
+class LeitnerScheduler:
+    def __init__(self, items, intervals=DEFAULT_INTERVALS, rng=None, slow_ms=DEFAULT_SLOW_MS):
+        """
+        items:     iterable of prompts (states) to schedule
+        intervals: review gap in prompts for each box; the number of boxes
+                   is len(intervals)
+        rng:       used only to shuffle the initial order
+        slow_ms:   correct answers slower than this keep the state in its box
+        """
+        self.intervals = tuple(intervals)
+        self.slow_ms = slow_ms
+        self.clock = 0
+        self._seq = 0
+        self.box = {}
+        self._heap = []
+
+        order = list(items)
+        (rng if rng is not None else random.Random()).shuffle(order)
+        for item in order:
+            self.box[item] = 0
+            self._push(item, 0)
+
+    def _push(self, item, due):
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, item))
+
+    def __len__(self):
+        return len(self._heap)
+
+    def next_item(self):
+        """Return the state that is due next (without removing it), or None."""
+        if not self._heap:
+            return None
+        due = self._heap[0][0]
+        if due > self.clock:
+            self.clock = due  # nothing is due yet: jump ahead to the next review
+        return self._heap[0][2]
+
+    def record(self, item, correct, response_ms=None):
+        """
+        Reschedule the state at the top of the heap after it was answered.
+        Returns True when the state has just been mastered and retired.
+        """
+        if not self._heap or self._heap[0][2] != item:
+            return False
+
+        self.clock += 1
+        if not correct:
+            box = 0
+        elif response_ms is not None and response_ms > self.slow_ms:
+            box = self.box[item]  # right, but slow to recall: review at the same gap
+        else:
+            box = self.box[item] + 1
+        if box >= len(self.intervals):
+            heapq.heappop(self._heap)
+            self.box[item] = box
+            return True
+
+        self.box[item] = box
+        self._seq += 1
+        heapq.heapreplace(self._heap, (self.clock + self.intervals[box], self._seq, item))
+        return False
+
+    def skip(self, item):
+        """Put a skipped state back at the end of the current review window."""
+        if not self._heap or self._heap[0][2] != item:
+            return
+        self._seq += 1
+        heapq.heapreplace(self._heap, (self.clock + self.intervals[0], self._seq, item))
+
+    def retire(self, items):
+        """Mark states as already mastered (e.g. from a resumed session)."""
+        items = set(items)
+        if not items:
+            return
+        self._heap = [entry for entry in self._heap if entry[2] not in items]
+        heapq.heapify(self._heap)
+        for item in items:
+            self.box[item] = len(self.intervals)
+
+    def mastered(self):
+        return len(self.box) - len(self._heap)
+
+
+# ---------- Built-in simulation ----------
+
+class SimulatedLearner:
+    """
+    A learner that already knows some capitals and picks up the others
+    when shown the right answer.
+    """
+
+    def __init__(self, items, rng, known_fraction=0.5, learn_rate=0.4):
+        self.rng = rng
+        self.learn_rate = learn_rate
+        self.known = {item for item in items if rng.random() < known_fraction}
+
+    def answer(self, item, correct_answer):
+        if item in self.known:
+            return correct_answer
+        return ""
+
+    def shown(self, item):
+        """Called after a wrong answer reveals the correct one."""
+        if self.rng.random() < self.learn_rate:
+            self.known.add(item)
+
+
+def run_session(engine, learner, mastery_streak, max_prompts=20000):
+    """
+    Drive one session until every state has been answered correctly
+    mastery_streak times in a row.  Returns the number of prompts used.
+    """
+    streak = dict.fromkeys(engine.items, 0)
+    unmastered = len(streak)
+    prompts = 0
+
+    while unmastered and prompts < max_prompts:
+        state = engine.next_question()
+        if state is None:
+            break
+        prompts += 1
+        correct_answer = engine.correct_answer()
+        if engine.check_answer(learner.answer(state, correct_answer)):
+            streak[state] += 1
+            if streak[state] == mastery_streak:
+                unmastered -= 1
+        else:
+            if streak[state] >= mastery_streak:
+                unmastered += 1
+            streak[state] = 0
+            learner.shown(state)
+    return prompts
+
+
+def simulate(use_scheduler, sessions=100, seed=0, items=states_capitals,
+             intervals=DEFAULT_INTERVALS):
+    """Average prompts-to-mastery for the Leitner scheduler or uniform picking."""
+    total = 0
+    for n in range(sessions):
+        rng = random.Random(seed * 1_000_003 + n)
+        scheduler = None
+        if use_scheduler:
+            scheduler = LeitnerScheduler(items, intervals, rng=rng)
+        engine = QuizEngine(items, retire_correct=False, rng=rng, scheduler=scheduler)
+        learner = SimulatedLearner(items, rng)
+        total += run_session(engine, learner, mastery_streak=len(intervals))
+    return total / sessions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare question schedulers.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    uniform = simulate(False, args.sessions, args.seed)
+    leitner = simulate(True, args.sessions, args.seed)
+    print(f"uniform random.choice : {uniform:8.1f} prompts to master all {len(states_capitals)}")
+    print(f"Leitner scheduler     : {leitner:8.1f} prompts to master all {len(states_capitals)}")
+    print(f"saving                : {100 * (1 - leitner / uniform):7.1f}%")
@@ -0,0 +1,214 @@
+"""
+Compact, resumable session state.
+
+A session is saved as a handful of bytes:
+
+    header    magic, format version, item count, CRC-32 of the item names
+    counters  score, questions asked, 64-bit RNG seed
+    mastered  one bit per state, in states_capitals order
+    revealed  one bit per state (capital labels shown on the map)
+
+With 50 states that is 40 bytes, so saving on close and restoring at
+start are effectively free.  Bit i always means the i-th name in the item
+set; the CRC guards against loading a file written for a different set.
+
+Random.getstate() is 2.5 KB, so instead the engine's generator is
+reseeded with a fresh 64-bit seed drawn from itself when the session is
+saved, and only that seed is stored: the restored session continues with
+exactly the questions the saved one would have asked next.
+
+Because sessions are plain integers once decoded, class-wide questions
+are bitwise operations: "mastered by everyone" is the AND of every
+student's mastered bits and "mastered by nobody" the complement of their
+OR.
+
+    python session_state.py --dir ~/.state-capitals-quiz/sessions
+"""
+import argparse
+import glob
+import os
+import re
+import struct
+import zlib
+from functools import reduce
+
+from answer_history import default_student
+from state_data import states_capitals
+
+MAGIC = b"QSS"
+VERSION = 1
+_HEADER = struct.Struct("<3sBHIIIQ")   # magic, version, count, crc, score, total, seed
+
+
+def default_session_dir():
+    return os.path.join(os.path.expanduser("~"), ".state-capitals-quiz", "sessions")
+
+
+def session_path(student=None, session_dir=None, gui=None):
+    """
+    Where a student's session is saved.  Sessions from a GUI other than the
+    simple quiz go in a subfolder named after it: "mastered" means retired
+    from the pool in the simple quiz but only Leitner-mastered in the map
+    quiz, so one must never resume the other's file.
+    """
+    safe_name = re.sub(r"[^\w.-]+", "_", student or default_student())
+    folder = session_dir or default_session_dir()
+    if gui is not None:
+        folder = os.path.join(folder, gui)
+    return os.path.join(folder, f"{safe_name}.session")
+
+
+class ItemBits:
+    """Fixed bit order over an item set: name <-> bit index."""
+
+    def __init__(self, items=states_capitals):
+        self.names = list(items)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.full = (1 << len(self.names)) - 1
+        self.nbytes = (len(self.names) + 7) // 8
+        self.crc = zlib.crc32("\n".join(map(str, self.names)).encode("utf-8"))
+
+    def pack(self, names):
+        bits = 0
+        for name in names:
+            bits |= 1 << self.index[name]
+        return bits
+
+    def unpack(self, bits):
+        return [name for i, name in enumerate(self.names) if bits >> i & 1]
+
+
+DEFAULT_BITS = ItemBits()
+
+
+class SessionState:
+    def __init__(self, mastered=0, revealed=0, score=0, total=0, seed=0, bits=DEFAULT_BITS):
+        self.bits = bits
+        self.mastered = mastered    # bitset of retired/mastered states
+        self.revealed = revealed    # bitset of capital labels shown on the map
+        self.score = score
+        self.total = total
+        self.seed = seed
+
+    # ---------- Engine <-> state ----------
+
+    @classmethod
+    def capture(cls, engine, revealed=(), bits=DEFAULT_BITS):
+        """Snapshot an engine; reseeds its RNG so the seed alone restores it."""
+        seed = engine.rng.getrandbits(64)
+        engine.rng.seed(seed)
+        retired = [name for name in bits.names if not engine.is_live(name)]
+        engine.set_retired(retired)   # same pool order a restore will build
+        return cls(
+            mastered=bits.pack(retired),
+            revealed=bits.pack(revealed),
+            score=engine.score,
+            total=engine.total_questions,
+            seed=seed,
+            bits=bits,
+        )
+
+    def apply(self, engine):
+        """Restore this state into a fresh engine; returns the revealed states."""
+        mastered = self.bits.unpack(self.mastered)
+        engine.set_retired(mastered)
+        retire = getattr(engine.scheduler, "retire", None)
+        if retire is not None:
+            retire(mastered)
+        engine.score = self.score
+        engine.total_questions = self.total
+        engine.rng.seed(self.seed)
+        return self.bits.unpack(self.revealed)
+
+    # ---------- Bytes ----------
+
+    def to_bytes(self):
+        n = self.bits.nbytes
+        return (
+            _HEADER.pack(MAGIC, VERSION, len(self.bits.names), self.bits.crc,
+                         self.score, self.total, self.seed)
+            + self.mastered.to_bytes(n, "little")
+            + self.revealed.to_bytes(n, "little")
+        )
+
+    @classmethod
+    def from_bytes(cls, data, bits=DEFAULT_BITS):
+        magic, version, count, crc, score, total, seed = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a saved quiz session")
+        if count != len(bits.names) or crc != bits.crc:
+            raise ValueError("saved session is for a different set of states")
+        start = _HEADER.size
+        n = bits.nbytes
+        if len(data) < start + 2 * n:
+            raise ValueError("saved session is truncated")
+        mastered = int.from_bytes(data[start:start + n], "little") & bits.full
+        revealed = int.from_bytes(data[start + n:start + 2 * n], "little") & bits.full
+        return cls(mastered, revealed, score, total, seed, bits)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, bits=DEFAULT_BITS):
+        """The saved session at path, or None if there is none (or it is unusable)."""
+        try:
+            with open(path, "rb") as f:
+                return cls.from_bytes(f.read(), bits)
+        except (OSError, ValueError, struct.error):
+            return None
+
+
+# ---------- Class-wide set operations ----------
+
+def load_class(session_dir=None, bits=DEFAULT_BITS):
+    """student file name -> SessionState for every readable session in a folder."""
+    sessions = {}
+    for path in sorted(glob.glob(os.path.join(session_dir or default_session_dir(), "*.session"))):
+        state = SessionState.load(path, bits)
+        if state is not None:
+            sessions[os.path.splitext(os.path.basename(path))[0]] = state
+    return sessions
+
+
+def mastered_by_everyone(masks, bits=DEFAULT_BITS):
+    return reduce(int.__and__, masks, bits.full)
+
+
+def mastered_by_someone(masks):
+    return reduce(int.__or__, masks, 0)
+
+
+def mastered_by_nobody(masks, bits=DEFAULT_BITS):
+    return bits.full & ~mastered_by_someone(masks)
+
+
+def mastery_counts(masks, bits=DEFAULT_BITS):
+    """state -> how many of the masks have its bit set."""
+    counts = [0] * len(bits.names)
+    for mask in masks:
+        while mask:
+            low = mask & -mask
+            counts[low.bit_length() - 1] += 1
+            mask ^= low
+    return dict(zip(bits.names, counts))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Class-wide mastery from saved sessions.")
+    parser.add_argument("--dir", default=default_session_dir())
+    args = parser.parse_args()
+
+    sessions = load_class(args.dir)
+    if not sessions:
+        raise SystemExit(f"No saved sessions in {args.dir}")
+    masks = [state.mastered for state in sessions.values()]
+    everyone = DEFAULT_BITS.unpack(mastered_by_everyone(masks))
+    nobody = DEFAULT_BITS.unpack(mastered_by_nobody(masks))
+    print(f"{len(sessions)} students")
+    print(f"Mastered by everyone ({len(everyone)}): {', '.join(everyone) or '-'}")
+    print(f"Mastered by nobody ({len(nobody)}): {', '.join(nobody) or '-'}")
@@ -0,0 +1,44 @@
+"""
+Shared quiz data used by both Tk front-ends and the headless engine.
+
+Kept free of any tkinter import so simulations, tests and servers can
+load it on machines without a display.
+
+The data itself lives in banks/us_capitals.json (see question_bank.py);
+these module-level dicts keep the shapes the rest of the code expects.
+"""
+import os
+
+from question_bank import US_CAPITALS, load_bank
+
+bank = load_bank(US_CAPITALS)
+
+# Dictionary of states and capitals
+states_capitals = bank.answers()
+
+# State flower and bird info: state -> (flower, bird)
+state_facts = bank.facts()
+
+# Label anchors on the 940x680 map and their hand-tuned (dx, dy) nudges
+state_positions = bank.positions()
+offsets = bank.offsets()
+
+# Regions, in display order: region -> tuple of states
+state_regions = bank.regions()
+
+# The map the positions are drawn on, and how capital labels are drawn on it
+# (shared by the map version and progress_export.py)
+MAP_WIDTH = bank.meta["map"]["width"]
+MAP_HEIGHT = bank.meta["map"]["height"]
+MAP_IMAGE_FILE = os.path.join(        # 940x680 map with dots already drawn
+    os.path.dirname(os.path.abspath(__file__)), bank.meta["map"]["image"]
+)
+LABEL_FONT = ("Helvetica", 9, "bold")
+LABEL_COLOR = "#111827"
+
+
+def get_state_position(state):
+    """Return base position plus any fine-tuned offset."""
+    x, y = state_positions[state]
+    dx, dy = offsets.get(state, (0, 0))
+    return x + dx, y + dy
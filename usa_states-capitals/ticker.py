@@ -0,0 +1,62 @@
+"""
+Drift-corrected periodic timer on top of Tk's `after`.
+
+Re-arming `after(interval, tick)` at the end of every tick makes each
+period a little longer than asked (the tick's own run time plus however
+late Tk got round to it), and a countdown built that way falls behind
+under load.  Ticker instead schedules tick n for start + n * interval on
+the perf_counter clock and computes each `after` delay from that, so
+lateness never accumulates.  If ticks fall more than a whole period
+behind, the missed ones are skipped rather than fired back to back.
+"""
+import time
+
+
+class Ticker:
+    def __init__(self, widget, interval_ms, callback):
+        """callback(elapsed_seconds) runs every interval_ms until stop()."""
+        self.widget = widget
+        self.interval = interval_ms / 1000
+        self.callback = callback
+        self.started_at = None
+        self._ticks = 0
+        self._after_id = None
+
+    @property
+    def running(self):
+        return self._after_id is not None
+
+    def start(self):
+        self.stop()
+        self.started_at = time.perf_counter()
+        self._ticks = 0
+        self._schedule()
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass  # widget already destroyed
+            self._after_id = None
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return time.perf_counter() - self.started_at
+
+    def _schedule(self):
+        self._ticks += 1
+        now = time.perf_counter()
+        due = self.started_at + self._ticks * self.interval
+        if due < now - self.interval:
+            # Far behind (e.g. the window was dragged): skip missed ticks
+            self._ticks = int((now - self.started_at) / self.interval) + 1
+            due = self.started_at + self._ticks * self.interval
+        delay_ms = max(0, int((due - now) * 1000))
+        self._after_id = self.widget.after(delay_ms, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self._schedule()            # re-arm first so a slow callback can't add drift
+        self.callback(self.elapsed())
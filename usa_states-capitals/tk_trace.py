@@ -0,0 +1,156 @@
+"""
+Opt-in tracing of Tk callbacks, written as Chrome / Perfetto trace JSON.
+
+    tracer = TkTracer()
+    tracer.enable()          # before building any widgets
+    ...                      # run the app
+    tracer.disable()
+    tracer.write("quiz-trace.json")
+
+Open the file in chrome://tracing or https://ui.perfetto.dev to see every
+button command, key binding and `after` timer as a bar on the timeline.
+
+enable() wraps tkinter.Misc._register, which every command=, bind() and
+after() callback passes through, so each callback records how long it ran.
+`after` / `after_idle` callbacks also record their queue delay: how late
+they started compared with when they were due.  A long delay means some
+other callback was hogging the event loop.
+
+Nothing is patched until enable() is called, so a normal run pays no
+tracing cost at all.  disable() restores tkinter; callbacks registered
+while tracing stay wrapped (Tk holds them), but the wrappers check
+`enabled` first and just call through once tracing is off.
+"""
+import json
+import os
+import threading
+import time
+import tkinter
+
+MAX_EVENTS = 500_000   # stop recording past this, so a forgotten trace can't eat all memory
+_AFTER_WRAPPER = "_tk_trace_after"
+
+
+def _callback_name(func):
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None)
+    if name is None:
+        name = repr(func)
+    return name
+
+
+class TkTracer:
+    def __init__(self):
+        self.events = []
+        self.enabled = False
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._original_register = None
+        self._original_after = None
+
+    def _now_us(self):
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def _add(self, name, cat, start_us, end_us, args=None):
+        if len(self.events) >= MAX_EVENTS:
+            return
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": start_us,
+            "dur": end_us - start_us,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    # ---------- Patching ----------
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        tracer = self
+        original_register = self._original_register = tkinter.Misc._register
+        original_after = self._original_after = tkinter.Misc.after
+
+        def traced_register(widget, func, subst=None, needcleanup=1):
+            # after() below already traces its own callbacks; tkinter wraps
+            # them in an internal closure named after ours, so skip that one
+            if getattr(func, "__name__", "") != _AFTER_WRAPPER:
+                func = tracer._wrap(func, "callback")
+            return original_register(widget, func, subst, needcleanup)
+
+        def traced_after(widget, ms, func=None, *args):
+            if func is None:
+                return original_after(widget, ms)   # plain sleep, nothing to trace
+            due_us = tracer._now_us() + (0 if ms == "idle" else ms * 1000)
+            name = _callback_name(func)
+            cat = "after_idle" if ms == "idle" else "after"
+
+            def timer(*call_args):
+                if not tracer.enabled:
+                    return func(*call_args)
+                start = tracer._now_us()
+                try:
+                    return func(*call_args)
+                finally:
+                    tracer._add(name, cat, start, tracer._now_us(), {
+                        "delay_ms": ms,
+                        "queue_delay_ms": round(max(0.0, start - due_us) / 1000, 3),
+                    })
+            timer.__name__ = _AFTER_WRAPPER
+            return original_after(widget, ms, timer, *args)
+
+        tkinter.Misc._register = tkinter.Misc.register = traced_register
+        tkinter.Misc.after = traced_after
+
+    def disable(self):
+        if not self.enabled:
+            return
+        tkinter.Misc._register = tkinter.Misc.register = self._original_register
+        tkinter.Misc.after = self._original_after
+        self.enabled = False
+
+    def _wrap(self, func, cat):
+        name = _callback_name(func)
+        tracer = self
+
+        def traced(*args):
+            if not tracer.enabled:
+                return func(*args)
+            start = tracer._now_us()
+            try:
+                return func(*args)
+            finally:
+                tracer._add(name, cat, start, tracer._now_us())
+        traced.__name__ = getattr(func, "__name__", "traced")
+        return traced
+
+    # ---------- Manual spans and output ----------
+
+    def span(self, name, cat="app"):
+        """Context manager that records a span for code outside Tk callbacks."""
+        return _Span(self, name, cat)
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        print(f"Wrote {len(self.events)} trace events to {path}")
+
+
+class _Span:
+    def __init__(self, tracer, name, cat):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.start = self.tracer._now_us()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._add(self.name, self.cat, self.start, self.tracer._now_us())
+        return False
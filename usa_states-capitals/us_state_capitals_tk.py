@@ -1,73 +1,52 @@
-import tkinter as tk
+import argparse
 import random
+import sys
+import tkinter as tk
 
-# Dictionary of states and capitals
-states_capitals = {
-    "Alabama": "Montgomery",
-    "Alaska": "Juneau",
-    "Arizona": "Phoenix",
-    "Arkansas": "Little Rock",
-    "California": "Sacramento",
-    "Colorado": "Denver",
-    "Connecticut": "Hartford",
-    "Delaware": "Dover",
-    "Florida": "Tallahassee",
-    "Georgia": "Atlanta",
-    "Hawaii": "Honolulu",
-    "Idaho": "Boise",
-    "Illinois": "Springfield",
-    "Indiana": "Indianapolis",
-    "Iowa": "Des Moines",
-    "Kansas": "Topeka",
-    "Kentucky": "Frankfort",
-    "Louisiana": "Baton Rouge",
-    "Maine": "Augusta",
-    "Maryland": "Annapolis",
-    "Massachusetts": "Boston",
-    "Michigan": "Lansing",
-    "Minnesota": "Saint Paul",
-    "Mississippi": "Jackson",
-    "Missouri": "Jefferson City",
-    "Montana": "Helena",
-    "Nebraska": "Lincoln",
-    "Nevada": "Carson City",
-    "New Hampshire": "Concord",
-    "New Jersey": "Trenton",
-    "New Mexico": "Santa Fe",
-    "New York": "Albany",
-    "North Carolina": "Raleigh",
-    "North Dakota": "Bismarck",
-    "Ohio": "Columbus",
-    "Oklahoma": "Oklahoma City",
-    "Oregon": "Salem",
-    "Pennsylvania": "Harrisburg",
-    "Rhode Island": "Providence",
-    "South Carolina": "Columbia",
-    "South Dakota": "Pierre",
-    "Tennessee": "Nashville",
-    "Texas": "Austin",
-    "Utah": "Salt Lake City",
-    "Vermont": "Montpelier",
-    "Virginia": "Richmond",
-    "Washington": "Olympia",
-    "West Virginia": "Charleston",
-    "Wisconsin": "Madison",
-    "Wyoming": "Cheyenne"
-}
+from answer_history import AnswerLog, default_student
+from answer_matching import CLOSE
+from autocomplete import AutocompleteDropdown, PrefixTrie
+from distractors import distractor_table
+from fireworks import FireworksRenderer
+from latency import overlay_text
+from question_types import DEFAULT_TYPE, MIXED, QUESTION_TYPES, QuestionSet
+from quiz_engine import QuizEngine
+from replay import SIMPLE, EventRecorder, new_seed
+from scheduler import LeitnerScheduler
+from session_state import ItemBits, SessionState, session_path
+from state_data import state_positions, states_capitals
+from tk_trace import TkTracer
 
 class StateCapitalQuiz:
-    def __init__(self, master):
+    def __init__(self, master, spaced=False, autocomplete=False, history=None, choices=False,
+                 session=None, ask=DEFAULT_TYPE, seed=None, recorder=None, frame_stats=False):
         self.master = master
+        self.history = history      # optional AnswerLog for every graded answer
+        self.session = session      # optional path progress is saved to and resumed from
+        self.recorder = recorder    # optional EventRecorder for every input (see replay.py)
+        self.frame_stats = frame_stats  # report fireworks frame times when the show ends
+        # Every random choice comes from this one generator, so a seed and
+        # the recorded inputs reproduce a session exactly
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = random.Random(self.seed)
+        # What is asked: state -> capital by default, or a type from
+        # question_types.py (capital -> state, bird/flower -> states, mixed)
+        self.questions = QuestionSet.named(ask)
+        items = self.questions.items
+        self.session_bits = ItemBits(items)
+        master.protocol("WM_DELETE_WINDOW", self.close)
         master.title("U.S. States and Capitals Quiz")
         master.geometry("420x320")
         master.configure(bg="#1e3a8a")  # deep blue background
 
-        self.score = 0
-        self.total_questions = 0
-        self.state = None
-
-        # States still available to be asked (removed once answered correctly)
-        self.remaining_states = list(states_capitals.keys())
+        # Quiz rules live in the headless engine; states are retired from
+        # its pool once answered correctly so they won't be asked again.
+        # With spaced=True a Leitner scheduler picks the order instead.
+        scheduler = LeitnerScheduler(items, rng=self.rng) if spaced else None
+        self.engine = QuizEngine(
+            items, retire_correct=True, rng=self.rng, scheduler=scheduler,
+            clock=recorder.clock if recorder is not None else None
+        )
 
         # Main content frame with lighter background
         self.main_frame = tk.Frame(master, bg="#e0f2fe", bd=4, relief="ridge")
@@ -85,7 +64,7 @@ class StateCapitalQuiz:
 
         self.label = tk.Label(
             self.main_frame,
-            text="Guess the capital of the state:",
+            text="Pick the capital of the state:" if choices else self.questions.types[0].question,
             bg="#e0f2fe",
             font=("Helvetica", 11)
         )
@@ -101,9 +80,39 @@ class StateCapitalQuiz:
         self.state_label.pack(pady=(2, 10))
 
         self.entry = tk.Entry(self.main_frame, font=("Helvetica", 12))
-        self.entry.pack()
         self.entry.bind("<Return>", lambda event: self.check_answer())
 
+        # Multiple choice: four buttons instead of typing. Wrong options are
+        # capitals of nearby or similar-looking states, precomputed once.
+        self.distractors = None
+        self.choice_buttons = []
+        if choices:
+            self.distractors = distractor_table(states_capitals, state_positions)
+            self.choice_frame = tk.Frame(self.main_frame, bg="#e0f2fe")
+            self.choice_frame.pack()
+            for n in range(4):
+                button = tk.Button(
+                    self.choice_frame,
+                    text="",
+                    width=16,
+                    font=("Helvetica", 11),
+                    bg="#ffffff",
+                    activebackground="#bfdbfe"
+                )
+                button.grid(row=n // 2, column=n % 2, padx=3, pady=3)
+                self.choice_buttons.append(button)
+                # Number keys 1-4 pick an option too
+                master.bind(str(n + 1), lambda event, n=n: self.choice_buttons[n].invoke())
+        else:
+            self.entry.pack()
+
+        # Optional suggestion list under the entry while the learner types
+        self.autocomplete = None
+        if autocomplete and not choices:
+            self.autocomplete = AutocompleteDropdown(
+                self.entry, PrefixTrie(self.questions.answers())
+            )
+
         self.submit_button = tk.Button(
             self.main_frame,
             text="Submit",
@@ -114,7 +123,8 @@ class StateCapitalQuiz:
             activebackground="#16a34a",
             activeforeground="white"
         )
-        self.submit_button.pack(pady=5)
+        if not choices:
+            self.submit_button.pack(pady=5)
 
         self.score_label = tk.Label(
             self.main_frame,
@@ -144,64 +154,138 @@ class StateCapitalQuiz:
         )
         self.feedback_text.pack(pady=(2, 0))
 
-        self.next_question()
+        # Debug overlay with response-latency stats (toggle with F12)
+        self.debug_label = tk.Label(
+            self.main_frame,
+            text="",
+            font=("Courier", 8),
+            justify="left",
+            bg="#e0f2fe",
+            fg="#334155"
+        )
+        master.bind("<F12>", lambda event: self.toggle_debug_overlay())
 
-        # Fireworks state
+        # Fireworks state (set before the first question: a resumed session
+        # may already be finished and go straight to the celebration)
         self.fireworks_window = None
         self.fireworks_canvas = None
-        self.fireworks_steps = 0
+        self.fireworks = None
+
+        saved = self._resume_session()
+        if recorder is not None:
+            recorder.start(
+                self.engine, SIMPLE, self.seed,
+                {"spaced": spaced, "choices": choices, "ask": ask},
+                session=saved
+            )
+        self.next_question()
+
+    def _resume_session(self):
+        """Pick up where a saved session left off (states already mastered, score)."""
+        if self.session is None:
+            return None
+        saved = SessionState.load(self.session, self.session_bits)
+        if saved is not None:
+            saved.apply(self.engine)
+            self.score_label.config(
+                text=f"Score: {self.engine.score}/{self.engine.total_questions}"
+            )
+        return saved
 
     def next_question(self):
-        """Select the next state from remaining_states or end the quiz if done."""
-        if not self.remaining_states:
+        """Ask the engine for the next state or end the quiz if done."""
+        item = self.engine.next_question()
+        if item is None:
             # All states have been answered correctly
-            self.state = None
             self.state_label.config(text="All done! 🎉")
             self.entry.config(state="disabled")
             self.submit_button.config(state="disabled")
+            for button in self.choice_buttons:
+                button.config(state="disabled")
             self.feedback_icon.config(text="")
             self.feedback_text.config(
-                text="You answered all 50 state capitals correctly in this session!",
+                text=f"You answered all {len(self.questions.items)} {self.questions.topic} "
+                     "correctly in this session!",
                 fg="#0f766e"
             )
             # Launch fireworks celebration
             self.show_fireworks()
             return
 
-        self.state = random.choice(self.remaining_states)
-        self.state_label.config(text=self.state)
+        question_type, prompt = self.questions.split(item)
+        if self.questions.mixed:
+            self.label.config(text=question_type.question)
+        self.state_label.config(text=prompt)
+        if self.distractors is not None:
+            options = self.distractors.choices(item, n=len(self.choice_buttons), rng=self.rng)
+            for button, option in zip(self.choice_buttons, options):
+                button.config(
+                    text=option,
+                    command=lambda option=option: self.check_answer(option)
+                )
         self.entry.delete(0, tk.END)
+        if self.autocomplete is not None:
+            self.autocomplete.cancel()
         self.entry.focus_set()
+        self._refresh_debug_overlay()
 
-    def check_answer(self):
-        if not self.state:
-            return  # Quiz is finished or not initialized
+    def toggle_debug_overlay(self):
+        if self.debug_label.winfo_ismapped():
+            self.debug_label.pack_forget()
+        else:
+            self.debug_label.pack(pady=(4, 0))
+            self._refresh_debug_overlay(force=True)
 
-        answer = self.entry.get().strip()
-        correct_answer = states_capitals[self.state]
+    def _refresh_debug_overlay(self, force=False):
+        if force or self.debug_label.winfo_ismapped():
+            self.debug_label.config(
+                text=overlay_text(self.engine.latency, self.engine.state)
+            )
 
-        self.total_questions += 1
+    def check_answer(self, answer=None):
+        item = self.engine.state
+        if not item:
+            return  # Quiz is finished or not initialized
 
-        if answer.lower() == correct_answer.lower():
-            # Correct
-            self.score += 1
-            self.feedback_icon.config(text="✔", fg="green")
-            self.feedback_text.config(
-                text=f"Correct! The capital of {self.state} is {correct_answer}.",
-                fg="green"
+        if answer is None:
+            answer = self.entry.get().strip()
+        if self.recorder is not None:
+            self.recorder.event("answer", answer=answer)
+        question_type, prompt = self.questions.split(item)
+        fact = question_type.describe(prompt)
+
+        # The engine retires correctly answered states from its pool
+        correct = self.engine.check_answer(answer)
+        if self.history is not None and question_type.key == DEFAULT_TYPE:
+            # The history (and analytics built on it) is per state capital;
+            # queued for the background writer, never waits on the disk
+            self.history.record(
+                prompt,
+                answer,
+                correct,
+                verdict=self.engine.last_result.verdict,
+                response_ms=self.engine.last_response_ms
             )
-            # Remove this state so it won't appear again this session
-            if self.state in self.remaining_states:
-                self.remaining_states.remove(self.state)
+
+        if correct:
+            # Correct (or a small typo away from it)
+            if self.engine.last_result.verdict == CLOSE:
+                text = f"Close enough! It's spelled {self.engine.last_result.expected}. {fact}"
+            else:
+                text = f"Correct! {fact}"
+            self.feedback_icon.config(text="✔", fg="green")
+            self.feedback_text.config(text=text, fg="green")
         else:
-            # Incorrect (state stays in remaining_states so it can appear again later)
+            # Incorrect (state stays in the pool so it can appear again later)
             self.feedback_icon.config(text="✘", fg="red")
             self.feedback_text.config(
-                text=f"Not quite. The capital of {self.state} is {correct_answer}.",
+                text=f"Not quite. {fact}",
                 fg="red"
             )
 
-        self.score_label.config(text=f"Score: {self.score}/{self.total_questions}")
+        self.score_label.config(
+            text=f"Score: {self.engine.score}/{self.engine.total_questions}"
+        )
         self.next_question()
 
     # ---------- Fireworks celebration ----------
@@ -218,7 +302,7 @@ class StateCapitalQuiz:
 
         msg = tk.Label(
             self.fireworks_window,
-            text="You did it!\nAll 50 state capitals correct! 🎉",
+            text=f"You did it!\nAll {len(self.questions.items)} {self.questions.topic} correct! 🎉",
             font=("Helvetica", 14, "bold"),
             bg="#020617",
             fg="#fbbf24",
@@ -238,7 +322,7 @@ class StateCapitalQuiz:
         close_btn = tk.Button(
             self.fireworks_window,
             text="Close",
-            command=self.fireworks_window.destroy,
+            command=self.close_fireworks,
             bg="#1d4ed8",
             fg="white",
             font=("Helvetica", 11, "bold"),
@@ -247,48 +331,142 @@ class StateCapitalQuiz:
         )
         close_btn.pack()
 
-        self.fireworks_steps = 0
-        self.animate_fireworks()
-
-    def animate_fireworks(self):
-        """Simple animated fireworks using random colored circles."""
-        if self.fireworks_canvas is None:
-            return
-
-        self.fireworks_steps += 1
-        self.fireworks_canvas.delete("burst")
-
-        colors = ["red", "yellow", "orange", "cyan", "magenta", "lime", "white"]
-        width = int(self.fireworks_canvas["width"])
-        height = int(self.fireworks_canvas["height"])
-
-        # Draw several bursts each frame
-        for _ in range(8):
-            x = random.randint(40, width - 40)
-            y = random.randint(40, height - 40)
-            radius = random.randint(8, 20)
-            color = random.choice(colors)
-
-            # central glow
-            self.fireworks_canvas.create_oval(
-                x - radius, y - radius, x + radius, y + radius,
-                outline=color, width=2, fill=""
+        self.fireworks_status = None
+        if self.frame_stats:
+            self.fireworks_status = tk.Label(
+                self.fireworks_window,
+                text="",
+                font=("Courier", 8),
+                bg="#020617",
+                fg="#94a3b8"
             )
+            self.fireworks_status.pack(pady=(4, 0))
 
-            # small spark dots around
-            for _ in range(6):
-                sx = x + random.randint(-radius*2, radius*2)
-                sy = y + random.randint(-radius*2, radius*2)
-                self.fireworks_canvas.create_oval(
-                    sx - 2, sy - 2, sx + 2, sy + 2,
-                    outline=color, fill=color, tags="burst"
-                )
-
-        # Keep animating for a while, then stop
-        if self.fireworks_steps < 50 and self.fireworks_window.winfo_exists():
-            self.fireworks_canvas.after(80, self.animate_fireworks)
+        # Pooled renderer: all canvas items are created once and reused
+        self.fireworks = FireworksRenderer(
+            self.fireworks_canvas, rng=self.rng,
+            on_finish=self._report_frame_stats if self.frame_stats else None
+        )
+        self.fireworks.start()
+
+    def _report_frame_stats(self, stats):
+        frames, average_ms, worst_ms = stats
+        text = f"fireworks: {frames} frames, avg {average_ms:.1f} ms, worst {worst_ms:.1f} ms"
+        self.fireworks_status.config(text=text)
+        print(text, file=sys.stderr)
+
+    def close_fireworks(self):
+        """Stop the animation timer before tearing down its window."""
+        if self.fireworks is not None:
+            self.fireworks.stop()
+        self.fireworks_window.destroy()
+
+    def close(self):
+        """Save the session and flush any queued answer history, then close the window."""
+        if self.session is not None:
+            try:
+                SessionState.capture(self.engine, bits=self.session_bits).save(self.session)
+            except OSError as e:
+                print(f"Could not save session: {e}")   # don't stop the window closing
+        if self.history is not None:
+            self.history.close()
+        if self.recorder is not None:
+            try:
+                self.recorder.close()
+            except OSError as e:
+                print(f"Could not save recording: {e}")
+        self.master.destroy()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--spaced",
+        action="store_true",
+        help="use Leitner spaced repetition instead of random order"
+    )
+    parser.add_argument(
+        "--autocomplete",
+        action="store_true",
+        help="suggest capital names while typing"
+    )
+    parser.add_argument(
+        "--choices",
+        action="store_true",
+        help="multiple choice: pick the capital from four options"
+    )
+    parser.add_argument(
+        "--ask",
+        choices=tuple(QUESTION_TYPES) + (MIXED,),
+        default=DEFAULT_TYPE,
+        help="what to ask: state-capital (default), capital-state, bird-state, "
+             "flower-state, or a mix of all of them"
+    )
+    parser.add_argument(
+        "--student",
+        help="name to file answer history under (default: login name)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="save progress on close and continue it next time"
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="don't save answer history"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="seed for the question order (default: a fresh one each run)"
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="record every input to FILE for headless replay (see replay.py)"
+    )
+    parser.add_argument(
+        "--frame-stats",
+        action="store_true",
+        help="report how long fireworks frames took to draw when the show ends"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="record Tk callback timings to a Chrome/Perfetto trace file"
+    )
+    args = parser.parse_args()
+    if args.choices and args.ask != DEFAULT_TYPE:
+        parser.error("--choices only works with --ask state-capital")
+
+    # Tracing must be switched on before any widget registers a callback
+    tracer = None
+    if args.trace:
+        tracer = TkTracer()
+        tracer.enable()
+
+    # Each question type keeps its own saved session
+    session = None
+    if args.resume:
+        student = args.student or default_student()
+        session = session_path(student if args.ask == DEFAULT_TYPE else f"{student}-{args.ask}")
+
     root = tk.Tk()
-    quiz = StateCapitalQuiz(root)
+    history = None if args.no_history else AnswerLog(student=args.student)
+    quiz = StateCapitalQuiz(
+        root,
+        spaced=args.spaced,
+        autocomplete=args.autocomplete,
+        history=history,
+        choices=args.choices,
+        session=session,
+        ask=args.ask,
+        seed=args.seed,
+        recorder=EventRecorder(args.record) if args.record else None,
+        frame_stats=args.frame_stats
+    )
     root.mainloop()
+
+    if tracer is not None:
+        tracer.disable()
+        tracer.write(args.trace)
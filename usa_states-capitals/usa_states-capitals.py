@@ -1,332 +1,113 @@
+import argparse
 import tkinter as tk
-from tkinter import messagebox
-import random
+import tkinter.font as tkfont
+import math
 import os
+import random
 
-# --- Layout constants for the map and window sizing ---
-MAP_WIDTH = 940
-MAP_HEIGHT = 680                     # corrected dimensions
-MAP_IMAGE_FILE = "usa_map.png"       # 940x680 map with dots already drawn
+from answer_history import AnswerLog
+from answer_matching import CLOSE
+from autocomplete import AutocompleteDropdown, PrefixTrie
+from label_layout import solve_layout
+from latency import overlay_text
+from map_assets import MapAssetLoader, StartupTimer, choose_scale
+from map_hit import HIT_RADIUS, DotLookup
+from quiz_engine import QuizEngine
+from replay import MAP, EventRecorder, new_seed
+from scheduler import LeitnerScheduler
+from session_state import SessionState, session_path
+from state_data import (
+    LABEL_COLOR, LABEL_FONT, MAP_HEIGHT, MAP_IMAGE_FILE, MAP_WIDTH, bank, get_state_position,
+    state_facts, state_positions, state_regions, states_capitals
+)
+from ticker import Ticker
+from tk_trace import TkTracer
+
+# --- Layout constants for window sizing (map size and label style: state_data) ---
 QUIZ_PANEL_WIDTH = 400               # approximate width reserved for the quiz panel
 WINDOW_PADDING = 40                  # padding around everything
-
-# Helper to convert a rough grid position (col,row) into pixel coordinates
-def pos(col, row):
-    """
-    Convert a grid col/row into an (x, y) pixel on the 940x680 map.
-
-    Tweak base_x/base_y/step_x/step_y for global nudging.
-    Then tweak per-state (col,row) values in state_positions below
-    until each label sits nicely near its dot.
-    """
-    base_x = 90
-    base_y = 95
-    step_x = 80   # horizontal distance between columns
-    step_y = 70   # vertical distance between rows
-    x = base_x + col * step_x
-    y = base_y + row * step_y
-    return x, y
-
-# Dictionary of states and capitals
-states_capitals = {
-    "Alabama": "Montgomery",
-    "Alaska": "Juneau",
-    "Arizona": "Phoenix",
-    "Arkansas": "Little Rock",
-    "California": "Sacramento",
-    "Colorado": "Denver",
-    "Connecticut": "Hartford",
-    "Delaware": "Dover",
-    "Florida": "Tallahassee",
-    "Georgia": "Atlanta",
-    "Hawaii": "Honolulu",
-    "Idaho": "Boise",
-    "Illinois": "Springfield",
-    "Indiana": "Indianapolis",
-    "Iowa": "Des Moines",
-    "Kansas": "Topeka",
-    "Kentucky": "Frankfort",
-    "Louisiana": "Baton Rouge",
-    "Maine": "Augusta",
-    "Maryland": "Annapolis",
-    "Massachusetts": "Boston",
-    "Michigan": "Lansing",
-    "Minnesota": "Saint Paul",
-    "Mississippi": "Jackson",
-    "Missouri": "Jefferson City",
-    "Montana": "Helena",
-    "Nebraska": "Lincoln",
-    "Nevada": "Carson City",
-    "New Hampshire": "Concord",
-    "New Jersey": "Trenton",
-    "New Mexico": "Santa Fe",
-    "New York": "Albany",
-    "North Carolina": "Raleigh",
-    "North Dakota": "Bismarck",
-    "Ohio": "Columbus",
-    "Oklahoma": "Oklahoma City",
-    "Oregon": "Salem",
-    "Pennsylvania": "Harrisburg",
-    "Rhode Island": "Providence",
-    "South Carolina": "Columbia",
-    "South Dakota": "Pierre",
-    "Tennessee": "Nashville",
-    "Texas": "Austin",
-    "Utah": "Salt Lake City",
-    "Vermont": "Montpelier",
-    "Virginia": "Richmond",
-    "Washington": "Olympia",
-    "West Virginia": "Charleston",
-    "Wisconsin": "Madison",
-    "Wyoming": "Cheyenne"
-}
-
-# Approximate label locations per state on the 940x680 map.
-# These are used ONLY for placing capital text near the pre-drawn dots.
-state_positions = {
-    # West / Pacific
-    "Washington": pos(0, 0),
-    "Oregon": pos(0, 1),
-    "California": pos(0, 3),
-
-    # Mountain
-    "Idaho": pos(1, 1),
-    "Nevada": pos(1, 2),
-    "Arizona": pos(1, 4),
-    "Montana": pos(2, 0),
-    "Wyoming": pos(2, 1),
-    "Utah": pos(2, 2),
-    "Colorado": pos(3, 2),
-    "New Mexico": pos(2, 4),
-
-    # Plains / Texas / Oklahoma
-    "North Dakota": pos(4, 0),
-    "South Dakota": pos(4, 1),
-    "Nebraska": pos(4, 2),
-    "Kansas": pos(4, 3),
-    "Oklahoma": pos(4, 5),
-    "Texas": pos(4, 5),
-
-    # Midwest / central
-    "Minnesota": pos(5, 0),
-    "Iowa": pos(5, 2),
-    "Missouri": pos(5, 3),
-    "Arkansas": pos(5, 4),
-    "Louisiana": pos(5, 5),
-
-    "Wisconsin": pos(6, 0),
-    "Illinois": pos(6, 2),
-    "Mississippi": pos(6, 5),
-
-    "Michigan": pos(7, 0),
-    "Indiana": pos(7, 2),
-    "Kentucky": pos(7, 3),
-    "Tennessee": pos(7, 4),
-    "Alabama": pos(7, 5),
-
-    # Southeast
-    "Georgia": pos(8, 5),
-    "Florida": pos(9, 6),
-    "South Carolina": pos(8, 4),
-    "North Carolina": pos(8, 3),
-
-    # Mid-Atlantic
-    "Virginia": pos(8, 2),
-    "West Virginia": pos(7, 2),
-    "Ohio": pos(7, 1),
-    "Pennsylvania": pos(8, 1),
-    "New York": pos(8, 0),
-    "Maryland": pos(9, 2),
-    "Delaware": pos(9, 3),
-    "New Jersey": pos(9, 2.5),
-
-    # New England
-    "Connecticut": pos(10, 2),
-    "Rhode Island": pos(10, 2.3),
-    "Massachusetts": pos(10, 1.7),
-    "Vermont": pos(9.5, 0.7),
-    "New Hampshire": pos(10, 0.6),
-    "Maine": pos(10.5, 0.25),
-
-    # Alaska & Hawaii (inset)
-    "Alaska": pos(1.5, 6.5),
-    "Hawaii": pos(3, 6.5),
-}
-
-# Fine-grained offsets for label tweaks: (dx, dy)
-offsets = {
-    # Atlanta (Georgia) – down/left
-    "Georgia": (-50, -12),
-    # Boston (Massachusetts) – down/left
-    "Massachusetts": (-8, -4),
-    # Dover (Delaware) – down/left
-    "Delaware": (-6, -12),
-    # Oklahoma (Oklahoma City) – down/left
-    "Oklahoma": (-10, -25),
-    # Annapolis (Maryland) – down/left
-    "Maryland": (-38, 38),
-    # Sacramento (California) – down/left
-    "California": (-50, 8),
-    # Cheyenne (Wyoming) – down/right
-    "Wyoming": (25, 72),
-    # Columbus (Ohio) – down/right
-    "Ohio": (6, 95),
-    # Madison (Wisconsin) – down/slightly left
-    "Wisconsin": (-13, 119),
-    # Montgomery (Alabama) – up/left (combined two requests)
-    "Alabama": (-35, -5),
-    # Jackson (Mississippi) – left
-    "Mississippi": (-8, 0),
-    # Baton Rouge (Louisiana) – down/slightly right
-    "Louisiana": (7, 48),
-    # Juneau (Alaska) – down/left
-    "Alaska": (-36, 52),
-    # Tallahassee (Florida) – moderately left
-    "Florida": (-115, -8),
-    # Helena (Montana) – down/slightly left
-    "Montana": (-15, 19),
-    # Columbia (South Carolina) – slightly down/right
-    "South Carolina": (-15, 28),
-    # Austin (Texas) – down/slightly right
-    "Texas": (17, 52),
-    # Topeka (Kansas) – slightly down/right
-    "Kansas": (5, 10),
-    # Honolulu (Hawaii) – moderately down/left
-    "Hawaii": (-35, 40),
-    # Lansing (Michigan) – down/slightly left
-    "Michigan": (-16, 119),
-    # Springfield (Illinois) – moderately down/slightly left
-    "Illinois": (-12, 42),
-    # Lincoln (Nebraska) – down/slightly right
-    "Nebraska": (6, 12),
-    # Santa Fe (New Mexico) – slightly right
-    "New Mexico": (5, 0),
-    # Albany (New York) – moderately down/slightly right
-    "New York": (37, 93),
-    # Phoenix (Arizona) – down
-    "Arizona": (-3, 18),
-    # Raleigh (North Carolina) – slightly down/right
-    "North Carolina": (13, 52),
-    # Denver (Colorado) – moderately down/slightly left
-    "Colorado": (-18, 52),
-    # Indianapolis (Indiana) – down/left
-    "Indiana": (-25, 39),
-    # Little Rock (Arkansas) – down/slightly right
-    "Arkansas": (5, 20),
-    # Pierre (South Dakota) – down/slightly left
-    "South Dakota": (-14, 16),
-    # Bismarck (North Dakota) – down/slightly left
-    "North Dakota": (-21, 25),
-    # Richmond (Virginia) – down/slightly right
-    "Virginia": (5, 75),
-    # Saint Paul (Minnesota) – moderately down/slightly left
-    "Minnesota": (-8, 82),
-    # Hartford (Connecticut) – slightly up/left
-    "Connecticut": (-58, -7),
-    # Des Moines (Iowa) – slightly down/slightly left
-    "Iowa": (-7, 10),
-    # Carson City (Nevada) – slightly down
-    "Nevada": (-66, 28),
-    # Montpelier (Vermont) – left
-    "Vermont": (-40, 0),
-    # Nashville (Tennessee) – slightly down/slightly left
-    "Tennessee": (-12, 5),
-    # Salt Lake City (Utah) – down/slightly left
-    "Utah": (-52, 38),
-    # Concord (New Hampshire) – down/left
-    "New Hampshire": (-40, 31),
-    # Providence (Rhode Island) – up/slightly left
-    "Rhode Island": (-38, -2),
-    # Frankfort (Kentucky) – down/slightly left
-    "Kentucky": (-6, 11),
-    # Augusta (Maine) – left
-    "Maine": (-70, 25),
-    # Salem (Oregon) – slightly up/left
-    "Oregon": (-20, -12),
-    # Charleston (West Virginia) – down/slightly right
-    "West Virginia": (26, 70),
-    # Harrisburg (Pennsylvania) – moderately down/slightly right
-    "Pennsylvania": (5, 68),
-}
-
-def get_state_position(state):
-    """Return base position plus any fine-tuned offset."""
-    x, y = state_positions[state]
-    dx, dy = offsets.get(state, (0, 0))
-    return x + dx, y + dy
-
-# State flower and bird info
-state_facts = {
-    "Alabama":      ("Camellia", "Yellowhammer"),
-    "Alaska":       ("Forget-me-not", "Willow ptarmigan"),
-    "Arizona":      ("Saguaro cactus blossom", "Cactus wren"),
-    "Arkansas":     ("Apple blossom", "Northern mockingbird"),
-    "California":   ("California poppy", "California quail"),
-    "Colorado":     ("Rocky Mountain columbine", "Lark bunting"),
-    "Connecticut":  ("Mountain laurel", "American robin"),
-    "Delaware":     ("Peach blossom", "Delaware blue hen"),
-    "Florida":      ("Orange blossom", "Northern mockingbird"),
-    "Georgia":      ("Cherokee rose", "Brown thrasher"),
-    "Hawaii":       ("Hawaiian hibiscus", "Nēnē (Hawaiian goose)"),
-    "Idaho":        ("Syringa (mock orange)", "Mountain bluebird"),
-    "Illinois":     ("Violet", "Northern cardinal"),
-    "Indiana":      ("Peony", "Northern cardinal"),
-    "Iowa":         ("Wild rose", "Eastern goldfinch"),
-    "Kansas":       ("Sunflower", "Western meadowlark"),
-    "Kentucky":     ("Goldenrod", "Northern cardinal"),
-    "Louisiana":    ("Magnolia", "Brown pelican"),
-    "Maine":        ("White pine cone and tassel", "Black-capped chickadee"),
-    "Maryland":     ("Black-eyed Susan", "Baltimore oriole"),
-    "Massachusetts":("Mayflower", "Black-capped chickadee"),
-    "Michigan":     ("Apple blossom", "American robin"),
-    "Minnesota":    ("Pink and white lady's slipper", "Common loon"),
-    "Mississippi":  ("Magnolia", "Northern mockingbird"),
-    "Missouri":     ("Hawthorn", "Eastern bluebird"),
-    "Montana":      ("Bitterroot", "Western meadowlark"),
-    "Nebraska":     ("Goldenrod", "Western meadowlark"),
-    "Nevada":       ("Sagebrush", "Mountain bluebird"),
-    "New Hampshire":("Purple lilac", "Purple finch"),
-    "New Jersey":   ("Violet", "Eastern goldfinch"),
-    "New Mexico":   ("Yucca flower", "Greater roadrunner"),
-    "New York":     ("Rose", "Eastern bluebird"),
-    "North Carolina":("Flowering dogwood", "Northern cardinal"),
-    "North Dakota": ("Wild prairie rose", "Western meadowlark"),
-    "Ohio":         ("Scarlet carnation", "Northern cardinal"),
-    "Oklahoma":     ("Oklahoma rose", "Scissor-tailed flycatcher"),
-    "Oregon":       ("Oregon grape", "Western meadowlark"),
-    "Pennsylvania": ("Mountain laurel", "Ruffed grouse"),
-    "Rhode Island": ("Violet", "Rhode Island Red"),
-    "South Carolina":("Yellow jessamine", "Carolina wren"),
-    "South Dakota": ("Pasque flower", "Ring-necked pheasant"),
-    "Tennessee":    ("Iris", "Northern mockingbird"),
-    "Texas":        ("Bluebonnet", "Northern mockingbird"),
-    "Utah":         ("Sego lily", "California gull"),
-    "Vermont":      ("Red clover", "Hermit thrush"),
-    "Virginia":     ("American dogwood", "Northern cardinal"),
-    "Washington":   ("Coast rhododendron", "American goldfinch"),
-    "West Virginia":("Rhododendron", "Northern cardinal"),
-    "Wisconsin":    ("Wood violet", "American robin"),
-    "Wyoming":      ("Indian paintbrush", "Western meadowlark")
-}
+HOVER_COLOR = "#f97316"               # ring around the dot under the mouse in click mode
+ALL_REGIONS = "All regions"
+# Quiz phases: answers are only graded while PROMPTING; during FEEDBACK a
+# single timer is pending and input is dropped until it advances
+PROMPTING = "prompting"
+FEEDBACK = "feedback"
+ADVANCING = "advancing"
+FINISHED = "finished"                # speed round over; no more input
+FEEDBACK_MS = 1200                   # how long answer feedback stays up
+RAPID_SECONDS = 60                   # length of a speed round
+TICK_MS = 100                        # speed-round countdown resolution
+# Fill colours stepped through when study mode fades labels in
+REVEAL_FADE = ("#c7d2fe", "#a5b4fc", "#818cf8", "#6366f1", "#4338ca", "#312e81", LABEL_COLOR)
+
+def region_tag(region):
+    """Canvas tag shared by every capital label in a region."""
+    return "region-" + region.lower().replace(" & ", "-").replace(" ", "-")
+
+def facts_rows(state, capital):
+    """(heading, value) rows shown in the facts panel for one state."""
+    flower, bird = state_facts.get(state, ("(not in table)", "(not in table)"))
+    return (("Capital", capital), ("State Flower", flower), ("State Bird", bird))
+
+# Built once at import: state -> facts panel rows
+facts_index = {state: facts_rows(state, capital) for state, capital in states_capitals.items()}
 
 
 class StateCapitalQuiz:
-    def __init__(self, master):
+    def __init__(self, master, spaced=False, autocomplete=False, history=None, click=False,
+                 rapid=False, session=None, seed=None, recorder=None,
+                 startup_times=False):
         self.master = master
-
-        # Compute a window size that fits the map + quiz nicely
-        window_width = MAP_WIDTH + QUIZ_PANEL_WIDTH + WINDOW_PADDING
-        window_height = MAP_HEIGHT + WINDOW_PADDING
+        self.history = history      # optional AnswerLog for every graded answer
+        self.session = session      # optional path progress is saved to and resumed from
+        self.recorder = recorder    # optional EventRecorder for every input (see replay.py)
+        # Every random choice comes from this one generator, so a seed and
+        # the recorded inputs reproduce a session exactly
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = random.Random(self.seed)
+        self.click_mode = click     # show a capital, learner clicks its state's dot
+        self.rapid = rapid          # 60 s speed round: no feedback pause
+        self._shown = {}            # widget -> options last passed to _set()
+        master.protocol("WM_DELETE_WINDOW", self.close)
+        self.startup = StartupTimer()
+        self.startup_times = startup_times  # print StartupTimer marks once the map is up
+
+        # Pick a pre-scaled map variant (HiDPI or small screen), then
+        # compute a window size that fits the map + quiz nicely
+        self.map_scale = choose_scale(
+            master,
+            MAP_WIDTH + QUIZ_PANEL_WIDTH + WINDOW_PADDING,
+            MAP_HEIGHT + WINDOW_PADDING
+        )
+        self.map_width = int(MAP_WIDTH * self.map_scale)
+        self.map_height = int(MAP_HEIGHT * self.map_scale)
+        window_width = self.map_width + QUIZ_PANEL_WIDTH + WINDOW_PADDING
+        window_height = self.map_height + WINDOW_PADDING
         master.title("U.S. States & Capitals Quiz 🗺️")
         master.geometry(f"{int(window_width)}x{int(window_height)}")
         master.configure(bg="#1e3a8a")  # deep blue background
 
-        self.score = 0
-        self.total_questions = 0
-        self.state = None
+        # Quiz rules live in the headless engine; the map version keeps
+        # asking every state, so nothing is retired from its pool.
+        # With spaced=True a Leitner scheduler picks the order instead.
+        scheduler = LeitnerScheduler(states_capitals, rng=self.rng) if spaced else None
+        self.engine = QuizEngine(
+            states_capitals, retire_correct=False, rng=self.rng, scheduler=scheduler,
+            clock=recorder.clock if recorder is not None else None, bank=bank
+        )
 
-        # Map overlays (capital labels)
+        # Map overlays (capital labels). Every label is created once, hidden,
+        # and tagged "capital" + its region tag; revealing or studying only
+        # changes item state on a tag.
         self.capital_labels = {}    # state -> label item id
+        self.label_positions = {}   # state -> solved top-left (x, y) of its label
+        self.revealed = set()       # states answered correctly (tag "revealed")
+        self.study_mode = False
+        self.study_region = tk.StringVar(value=ALL_REGIONS)
+        self._reveal_after = None
+        self.phase = PROMPTING
+        self._advance_after = None  # the one pending feedback -> next question timer
+        self.facts_window = None    # non-modal facts panel, built on first use
 
         # ====== MAIN LAYOUT FRAMES ======
         self.main_frame = tk.Frame(master, bg="#1e3a8a")
@@ -352,14 +133,51 @@ class StateCapitalQuiz:
 
         self.map_canvas = tk.Canvas(
             self.map_frame,
-            width=MAP_WIDTH,
-            height=MAP_HEIGHT,
+            width=self.map_width,
+            height=self.map_height,
             bg="#e0f2fe",
             highlightthickness=0
         )
         self.map_canvas.pack(anchor="nw")
+        self._solve_label_positions()
+        self._create_capital_labels()
 
-        # Load your map image (with built-in dots)
+        # Debug overlay with response-latency stats (toggle with F12)
+        self.debug_item = self.map_canvas.create_text(
+            8, 8,
+            text="",
+            anchor="nw",
+            font=("Courier", 9),
+            fill="#0f172a",
+            state="hidden",
+            tags="debug"
+        )
+        master.bind("<F12>", lambda event: self.toggle_debug_overlay())
+
+        # Click mode: a precomputed nearest-dot table resolves hover and
+        # clicks, and one reusable ring highlights the dot under the mouse
+        self.dot_lookup = None
+        self.hover_state = None
+        if click:
+            self.dot_lookup = DotLookup(
+                {state: get_state_position(state) for state in state_positions},
+                MAP_WIDTH,
+                MAP_HEIGHT
+            )
+            self.hover_item = self.map_canvas.create_oval(
+                0, 0, 0, 0,
+                outline=HOVER_COLOR,
+                width=3,
+                state="hidden",
+                tags="hover"
+            )
+            self.map_canvas.bind("<Motion>", self.on_map_motion)
+            self.map_canvas.bind("<Leave>", lambda event: self._set_hover(None))
+            self.map_canvas.bind("<Button-1>", self.on_map_click)
+            self.map_canvas.config(cursor="crosshair")
+
+        # Load your map image (with built-in dots) in the background;
+        # the quiz panel below is usable before it arrives
         self.map_image = None
         self._load_map_image()
 
@@ -376,7 +194,10 @@ class StateCapitalQuiz:
 
         sublabel = tk.Label(
             self.quiz_frame,
-            text="Type the capital for the state below:",
+            text=(
+                "Click the state whose capital is below:" if click
+                else "Type the capital for the state below:"
+            ),
             font=("Helvetica", 12),
             bg="#bfdbfe",
             fg="#1e293b",
@@ -393,9 +214,10 @@ class StateCapitalQuiz:
         )
         self.state_label.pack(pady=10)
 
-        # Entry area
+        # Entry area (not needed when answering by clicking the map)
         entry_frame = tk.Frame(self.quiz_frame, bg="#bfdbfe")
-        entry_frame.pack(pady=5)
+        if not click:
+            entry_frame.pack(pady=5)
 
         prompt_label = tk.Label(
             entry_frame,
@@ -414,6 +236,13 @@ class StateCapitalQuiz:
         self.entry.grid(row=0, column=1)
         self.entry.bind("<Return>", lambda event: self.check_answer())
 
+        # Optional suggestion list under the entry while the learner types
+        self.autocomplete = None
+        if autocomplete:
+            self.autocomplete = AutocompleteDropdown(
+                self.entry, PrefixTrie(states_capitals.values())
+            )
+
         # Buttons
         button_frame = tk.Frame(self.quiz_frame, bg="#bfdbfe")
         button_frame.pack(pady=15)
@@ -430,7 +259,8 @@ class StateCapitalQuiz:
             padx=10,
             command=self.check_answer
         )
-        self.submit_button.grid(row=0, column=0, padx=5)
+        if not click:
+            self.submit_button.grid(row=0, column=0, padx=5)
 
         self.skip_button = tk.Button(
             button_frame,
@@ -461,6 +291,34 @@ class StateCapitalQuiz:
         )
         self.facts_button.grid(row=1, column=0, columnspan=2, pady=(10, 0))
 
+        # Study mode: show every capital (or one region) on the map
+        study_frame = tk.Frame(button_frame, bg="#bfdbfe")
+        study_frame.grid(row=2, column=0, columnspan=2, pady=(10, 0))
+
+        self.study_button = tk.Button(
+            study_frame,
+            text="Study Mode 📖",
+            font=("Helvetica", 11),
+            bg="#0ea5e9",
+            fg="white",
+            activebackground="#0284c7",
+            activeforeground="white",
+            relief="raised",
+            padx=10,
+            command=self.toggle_study_mode
+        )
+        self.study_button.grid(row=0, column=0, padx=(0, 5))
+
+        region_menu = tk.OptionMenu(
+            study_frame,
+            self.study_region,
+            ALL_REGIONS,
+            *state_regions,
+            command=lambda region: self._show_study_labels()
+        )
+        region_menu.config(font=("Helvetica", 10), bg="#e0f2fe")
+        region_menu.grid(row=0, column=1)
+
         # Feedback label
         self.feedback_label = tk.Label(
             self.quiz_frame,
@@ -483,139 +341,675 @@ class StateCapitalQuiz:
         )
         self.score_label.pack(pady=(5, 0))
 
+        # Speed round: countdown and questions-per-minute, driven by a
+        # drift-corrected ticker that only touches the label on change
+        self.ticker = None
+        if rapid:
+            self.timer_label = tk.Label(
+                self.quiz_frame,
+                text="",
+                font=("Helvetica", 14, "bold"),
+                bg="#bfdbfe",
+                fg="#b45309"
+            )
+            self.timer_label.pack(pady=(5, 0))
+            self.ticker = Ticker(master, TICK_MS, self._on_tick)
+
         # Start first question
+        saved = self._resume_session()
+        if recorder is not None:
+            recorder.start(
+                self.engine, MAP, self.seed,
+                {"spaced": spaced, "click": click, "rapid": rapid, "round_seconds": RAPID_SECONDS},
+                session=saved
+            )
         self.next_question()
+        if self.ticker is not None:
+            # Count only this round, not a resumed session's earlier answers
+            self.round_start = (self.engine.total_questions, self.engine.score)
+            self.ticker.start()
+            self._on_tick(0.0)
+        self.startup.mark_when_idle(master, "interactive")
 
     def _load_map_image(self):
         """
-        Try to load the map image. If not found, show a placeholder.
+        Start loading the map image (cached and pre-scaled by
+        MapAssetLoader). If it can't be loaded, show a placeholder.
         """
-        if os.path.exists(MAP_IMAGE_FILE):
-            try:
-                self.map_image = tk.PhotoImage(file=MAP_IMAGE_FILE)
-                self.map_canvas.create_image(0, 0, anchor="nw", image=self.map_image)
-                return
-            except Exception as e:
-                print(f"Could not load {MAP_IMAGE_FILE}: {e}")
+        if not os.path.exists(MAP_IMAGE_FILE):
+            self._draw_map_placeholder()
+            return
+
+        self.map_canvas.create_text(
+            self.map_width // 2, self.map_height // 2,
+            text="Loading map…",
+            font=("Helvetica", 16, "italic"),
+            fill="#1e3a8a",
+            tags="map_loading"
+        )
+        MapAssetLoader(MAP_IMAGE_FILE).load_async(
+            self.master, self._on_map_loaded, scale=self.map_scale
+        )
+
+    def _on_map_loaded(self, image):
+        """Called on the Tk thread once the map image is ready (or failed)."""
+        self.map_canvas.delete("map_loading")
+        if image is None:
+            self._draw_map_placeholder()
+            return
 
+        self.map_image = image
+        # Don't assume 940x680: size the canvas and labels to the real image
+        self.map_width = image.width()
+        self.map_height = image.height()
+        self.map_scale = self.map_width / MAP_WIDTH
+        self.map_canvas.config(width=self.map_width, height=self.map_height)
+        self.map_canvas.create_image(0, 0, anchor="nw", image=image, tags="map")
+        self.map_canvas.tag_lower("map")  # keep any labels drawn meanwhile on top
+        self.relayout_labels()
+
+        self.startup.mark("map ready")
+        if self.startup_times:
+            self.master.after_idle(self.startup.report)
+
+    def _draw_map_placeholder(self):
         # Fallback: placeholder if image not found
         self.map_canvas.create_rectangle(
-            10, 10, MAP_WIDTH - 10, MAP_HEIGHT - 10,
+            10, 10, self.map_width - 10, self.map_height - 10,
             fill="#bbf7d0",
             outline="#15803d",
             width=3
         )
         self.map_canvas.create_text(
-            MAP_WIDTH // 2, MAP_HEIGHT // 2 - 20,
+            self.map_width // 2, self.map_height // 2 - 20,
             text="USA Map Placeholder",
             font=("Helvetica", 20, "bold"),
             fill="#065f46"
         )
         self.map_canvas.create_text(
-            MAP_WIDTH // 2, MAP_HEIGHT // 2 + 20,
-            text=f"Place '{MAP_IMAGE_FILE}' (940x680)\n in this folder for a real map!",
+            self.map_width // 2, self.map_height // 2 + 20,
+            text=f"Place '{os.path.basename(MAP_IMAGE_FILE)}' (940x680)\n in this folder for a real map!",
             font=("Helvetica", 14),
             fill="#0f172a"
         )
 
+    def _solve_label_positions(self):
+        """
+        Lay out every capital label around its dot for the current map size
+        and font, so revealed labels never overlap (see label_layout.py).
+        """
+        font = tkfont.Font(font=LABEL_FONT)
+        line_height = font.metrics("linespace")
+        anchors = {}
+        extents = {}
+        for state in state_positions:
+            x, y = get_state_position(state)
+            anchors[state] = (x * self.map_scale, y * self.map_scale)
+            extents[state] = (font.measure(states_capitals[state]), line_height)
+
+        self.label_positions = solve_layout(
+            anchors, extents, self.map_width, self.map_height, LABEL_FONT
+        )
+
+    def relayout_labels(self):
+        """Re-solve the layout (after a resize or font change) and move existing labels."""
+        self._solve_label_positions()
+        for state, item in self.capital_labels.items():
+            self.map_canvas.coords(item, *self.label_positions[state])
+
+    def _create_capital_labels(self):
+        """Create every capital label once, hidden, under shared tags."""
+        for region, states in state_regions.items():
+            for state in states:
+                if state not in self.label_positions:
+                    continue  # no coordinates defined for this state
+                x, y = self.label_positions[state]
+                self.capital_labels[state] = self.map_canvas.create_text(
+                    x,
+                    y,
+                    text=states_capitals.get(state, ""),
+                    anchor="nw",
+                    font=LABEL_FONT,
+                    fill=LABEL_COLOR,
+                    state="hidden",
+                    tags=("capital", region_tag(region))
+                )
+
     def _label_capital_on_map(self, state):
         """
-        Add the capital name near the state's existing dot (only once per state).
-        We rely on state_positions + offsets to find a good place for the text.
+        Reveal the capital name near the state's existing dot (only once per state).
+        The label already exists at its solved, collision-free spot.
         """
-        if state in self.capital_labels:
-            return  # already labeled
+        if state in self.revealed or state not in self.capital_labels:
+            return  # already labeled, or no coordinates defined for this state
+
+        self.revealed.add(state)
+        item = self.capital_labels[state]
+        self.map_canvas.addtag_withtag("revealed", item)
+        if not self.study_mode:
+            self.map_canvas.itemconfigure(item, state="normal")
+
+    # ---------- Study mode ----------
+
+    def toggle_study_mode(self):
+        self.study_mode = not self.study_mode
+        if self.study_mode:
+            self.study_button.config(text="Back to Quiz 🎯")
+            self._show_study_labels()
+        else:
+            self.study_button.config(text="Study Mode 📖")
+            self._cancel_reveal()
+            # Back to only the capitals answered so far
+            self.map_canvas.itemconfigure("capital", state="hidden", fill=LABEL_COLOR)
+            self.map_canvas.itemconfigure("revealed", state="normal")
+
+    def _show_study_labels(self):
+        """Show all labels, or the chosen region's, with one call per tag."""
+        if not self.study_mode:
+            return
+        region = self.study_region.get()
+        tag = "capital" if region == ALL_REGIONS else region_tag(region)
+
+        self._cancel_reveal()
+        self.map_canvas.itemconfigure("capital", state="hidden")
+        self.map_canvas.itemconfigure(tag, state="normal")
+        self._animate_reveal(tag, 0)
+
+    def _animate_reveal(self, tag, step):
+        """Fade the shown labels in by recolouring the whole tag each frame."""
+        self.map_canvas.itemconfigure(tag, fill=REVEAL_FADE[step])
+        if step + 1 < len(REVEAL_FADE):
+            self._reveal_after = self.master.after(
+                40, self._animate_reveal, tag, step + 1
+            )
+        else:
+            self._reveal_after = None
+
+    def _cancel_reveal(self):
+        if self._reveal_after is not None:
+            self.master.after_cancel(self._reveal_after)
+            self._reveal_after = None
+
+    def _resume_session(self):
+        """Pick up where a saved session left off: score and revealed capitals."""
+        if self.session is None:
+            return None
+        saved = SessionState.load(self.session)
+        if saved is None:
+            return None
+        for state in saved.apply(self.engine):
+            self._label_capital_on_map(state)
+        self._set(
+            self.score_label,
+            text=f"Score: {self.engine.score}/{self.engine.total_questions}"
+        )
+        return saved
 
-        if state not in state_positions:
-            return  # no coordinates defined for this state
+    # ---------- Question flow ----------
 
-        x, y = get_state_position(state)
-        capital = states_capitals.get(state, "")
+    def _record(self, kind, **fields):
+        if self.recorder is not None:
+            self.recorder.event(kind, **fields)
 
-        # Draw the text slightly offset from the dot so it doesn't cover it
-        text = self.map_canvas.create_text(
-            x + 10,
-            y - 8,
-            text=capital,
-            anchor="w",
-            font=("Helvetica", 9, "bold"),
-            fill="#111827"
-        )
-        self.capital_labels[state] = text
+    def _set(self, widget, **options):
+        """widget.config(**options), skipping options that already have that value."""
+        shown = self._shown.setdefault(widget, {})
+        changed = {key: value for key, value in options.items() if shown.get(key) != value}
+        if changed:
+            widget.config(**changed)
+            shown.update(changed)
+
+    def _show_feedback(self):
+        """
+        Enter FEEDBACK: pick the next state now, while the learner reads the
+        feedback, and schedule the one timer that moves on to it.
+        A speed round skips the pause and moves on at once.
+        """
+        if self.rapid:
+            self.next_question()
+            return
+        self.phase = FEEDBACK
+        self._set(self.submit_button, state="disabled")
+        if self.click_mode and self.facts_window is not None and self.facts_window.winfo_viewable():
+            self._refresh_facts_panel()   # answered: now the state can be named
+        self.engine.prefetch()
+        self._cancel_advance()
+        self._advance_after = self.master.after(FEEDBACK_MS, self._on_advance_timer)
+
+    def _on_advance_timer(self):
+        self._record("advance")
+        self._advance()
+
+    def _advance(self):
+        self._advance_after = None
+        self.phase = ADVANCING
+        self.next_question()
+
+    def _cancel_advance(self):
+        if self._advance_after is not None:
+            self.master.after_cancel(self._advance_after)
+            self._advance_after = None
 
     def next_question(self):
-        self.state = random.choice(list(states_capitals.keys()))
-        self.state_label.config(text=self.state)
+        self._cancel_advance()
+        self.phase = PROMPTING
+        self._set(self.submit_button, state="normal")
+        state = self.engine.next_question()
+        if state is None:
+            # Only reachable in spaced mode, once every state is mastered
+            self._set(self.state_label, text="All done! 🎉")
+            self._set(
+                self.feedback_label,
+                text="You've mastered all 50 state capitals!",
+                fg="#15803d"
+            )
+            return
+
+        # Keep an open facts panel in step with the quiz
+        if self.facts_window is not None and self.facts_window.winfo_viewable():
+            self._refresh_facts_panel()
+
+        if self.click_mode:
+            self._set(self.state_label, text=self.engine.correct_answer())
+            if not self.rapid:   # keep the last answer's feedback up in a speed round
+                self._set(
+                    self.feedback_label,
+                    text="Which state is this the capital of? Click its dot!",
+                    fg="#0f766e"
+                )
+            self._refresh_debug_overlay()
+            return
+
+        self._set(self.state_label, text=state)
         self.entry.delete(0, tk.END)
+        if self.autocomplete is not None:
+            self.autocomplete.cancel()
         self.entry.focus_set()
-        self.feedback_label.config(
-            text="What is the capital of this state?",
-            fg="#0f766e"
+        if not self.rapid:
+            self._set(
+                self.feedback_label,
+                text="What is the capital of this state?",
+                fg="#0f766e"
+            )
+        self._refresh_debug_overlay()
+
+    # ---------- Speed round ----------
+
+    def _round_counts(self):
+        """(questions answered, answers right) since the speed round started."""
+        total, score = self.round_start
+        return self.engine.total_questions - total, self.engine.score - score
+
+    def _on_tick(self, elapsed):
+        self._record("tick", elapsed=elapsed)
+        remaining = RAPID_SECONDS - elapsed
+        if remaining <= 0:
+            self._end_speed_round()
+            return
+        answered, _ = self._round_counts()
+        per_minute = answered * 60 / elapsed if elapsed >= 1 else 0
+        self._set(
+            self.timer_label,
+            text=f"⏱ {math.ceil(remaining)}s   ⚡ {per_minute:.0f} per minute"
         )
 
-    def skip_question(self):
-        if self.state is not None:
-            correct_answer = states_capitals[self.state]
-            self.feedback_label.config(
-                text=f"Skipped! The capital of {self.state} is {correct_answer}.",
-                fg="#b91c1c"
+    def _end_speed_round(self):
+        self.ticker.stop()
+        self._cancel_advance()
+        self.phase = FINISHED
+        self._set(self.submit_button, state="disabled")
+        self._set(self.skip_button, state="disabled")
+        self._set(self.state_label, text="Time's up! ⏱")
+        answered, right = self._round_counts()
+        per_minute = answered * 60 / RAPID_SECONDS
+        self._set(self.timer_label, text=f"⏱ 0s   ⚡ {per_minute:.0f} per minute")
+        self._set(
+            self.feedback_label,
+            text=(
+                f"You answered {answered} questions in "
+                f"{RAPID_SECONDS} seconds and got {right} right!"
+            ),
+            fg="#15803d"
+        )
+
+    def toggle_debug_overlay(self):
+        shown = self.map_canvas.itemcget(self.debug_item, "state") != "hidden"
+        self.map_canvas.itemconfigure(self.debug_item, state="hidden" if shown else "normal")
+        if not shown:
+            self.map_canvas.tag_raise(self.debug_item)
+            self._refresh_debug_overlay()
+
+    def _refresh_debug_overlay(self):
+        if self.map_canvas.itemcget(self.debug_item, "state") == "hidden":
+            return
+        self.map_canvas.itemconfigure(
+            self.debug_item,
+            text=overlay_text(self.engine.latency, self.engine.state)
+        )
+
+    # ---------- Click mode ----------
+
+    def _map_point(self, event):
+        """Event position in unscaled map pixels."""
+        return (
+            self.map_canvas.canvasx(event.x) / self.map_scale,
+            self.map_canvas.canvasy(event.y) / self.map_scale
+        )
+
+    def on_map_motion(self, event):
+        self._set_hover(self.dot_lookup.at(*self._map_point(event)))
+
+    def _set_hover(self, state):
+        """Move the hover ring, touching the canvas only when the state changes."""
+        if state == self.hover_state:
+            return
+        self.hover_state = state
+        if state is None:
+            self.map_canvas.itemconfigure(self.hover_item, state="hidden")
+            return
+        x, y = get_state_position(state)
+        r = HIT_RADIUS / 3
+        s = self.map_scale
+        self.map_canvas.coords(self.hover_item, (x - r) * s, (y - r) * s, (x + r) * s, (y + r) * s)
+        self.map_canvas.itemconfigure(self.hover_item, state="normal")
+        self.map_canvas.tag_raise(self.hover_item)
+
+    def on_map_click(self, event):
+        state = self.engine.state
+        if state is None or self.phase != PROMPTING:
+            return  # finished, or still showing feedback for the last click
+
+        clicked = self.dot_lookup.at(*self._map_point(event))
+        if clicked is None:
+            self._set(
+                self.feedback_label,
+                text="Click on one of the dots on the map 🙂",
+                fg="#b45309"
             )
-        self.next_question()
+            return
 
-    def check_answer(self):
-        if self.state is None:
+        # Grade it as if the learner had typed the clicked state's capital
+        answer = states_capitals[clicked]
+        self._record("answer", answer=answer)
+        correct_answer = self.engine.correct_answer()
+        correct = self.engine.check_answer(answer)
+        if self.history is not None:
+            self.history.record(
+                state,
+                answer,
+                correct,
+                verdict=self.engine.last_result.verdict,
+                response_ms=self.engine.last_response_ms
+            )
+
+        if correct:
+            text = f"🎉 Correct! {correct_answer} is the capital of {state}."
+            self._set(self.feedback_label, text=text, fg="#15803d")
+            self._label_capital_on_map(state)
+        else:
+            text = f"Oops! That's {clicked}. {correct_answer} is the capital of {state}."
+            self._set(self.feedback_label, text=text, fg="#b91c1c")
+
+        self._set(
+            self.score_label,
+            text=f"Score: {self.engine.score}/{self.engine.total_questions}"
+        )
+        self._show_feedback()
+
+    def skip_question(self):
+        if self.phase == FINISHED:
+            return
+        if self.phase == FEEDBACK:
+            self._record("skip")
+            self._advance()   # don't wait out the feedback
             return
+        state = self.engine.state
+        if state is None:
+            return
+        self._record("skip")
+        correct_answer = self.engine.correct_answer()
+        self._set(
+            self.feedback_label,
+            text=f"Skipped! The capital of {state} is {correct_answer}.",
+            fg="#b91c1c"
+        )
+        self.engine.skip()
+        self._show_feedback()
+
+    def check_answer(self):
+        state = self.engine.state
+        if state is None or self.phase != PROMPTING:
+            return  # finished, or Enter pressed again while feedback is showing
 
         answer = self.entry.get().strip()
         if not answer:
-            self.feedback_label.config(
+            self._set(
+                self.feedback_label,
                 text="Type your answer in the box first 🙂",
                 fg="#b45309"
             )
             return
 
-        correct_answer = states_capitals[self.state]
-        self.total_questions += 1
-
-        if answer.lower() == correct_answer.lower():
-            self.score += 1
-            self.feedback_label.config(
-                text=f"🎉 Correct! The capital of {self.state} is {correct_answer}.",
-                fg="#15803d"
+        self._record("answer", answer=answer)
+        correct_answer = self.engine.correct_answer()
+
+        correct = self.engine.check_answer(answer)
+        if self.history is not None:
+            # Queued for the background writer; never waits on the disk
+            self.history.record(
+                state,
+                answer,
+                correct,
+                verdict=self.engine.last_result.verdict,
+                response_ms=self.engine.last_response_ms
             )
+
+        if correct:
+            if self.engine.last_result.verdict == CLOSE:
+                text = f"✅ Close enough! The capital of {state} is spelled {correct_answer}."
+            else:
+                text = f"🎉 Correct! The capital of {state} is {correct_answer}."
+            self._set(self.feedback_label, text=text, fg="#15803d")
             # Label the capital on the map near its dot
-            self._label_capital_on_map(self.state)
+            self._label_capital_on_map(state)
         else:
-            self.feedback_label.config(
-                text=f"Oops! The capital of {self.state} is {correct_answer}.",
-                fg="#b91c1c"
-            )
+            others = self.engine.last_result.matches_other
+            if others:
+                text = (
+                    f"Oops! {answer} is the capital of {others[0]}. "
+                    f"The capital of {state} is {correct_answer}."
+                )
+            else:
+                text = f"Oops! The capital of {state} is {correct_answer}."
+            self._set(self.feedback_label, text=text, fg="#b91c1c")
+
+        self._set(
+            self.score_label,
+            text=f"Score: {self.engine.score}/{self.engine.total_questions}"
+        )
+        self._show_feedback()
 
-        self.score_label.config(text=f"Score: {self.score}/{self.total_questions}")
-        self.master.after(1200, self.next_question)
+    # ---------- State facts panel ----------
 
     def show_state_facts(self):
-        """Pop up a window with the current state's capital, flower, and bird."""
-        if self.state is None:
-            messagebox.showinfo("State Facts", "No state selected yet!")
-            return
-
-        capital = states_capitals.get(self.state, "Unknown")
-        flower, bird = state_facts.get(
-            self.state,
-            ("(not in table)", "(not in table)")
+        """
+        Show the current state's capital, flower and bird in a small
+        non-modal window.  The window is built once and only hidden when
+        closed, so reopening it just refills its labels; unlike a
+        messagebox it never blocks the event loop or the quiz timers.
+        """
+        self._record("facts")
+        if self.facts_window is None:
+            self._build_facts_panel()
+        self._refresh_facts_panel()
+        self.facts_window.deiconify()
+        self.facts_window.lift()
+
+    def _build_facts_panel(self):
+        window = self.facts_window = tk.Toplevel(self.master)
+        window.resizable(False, False)
+        window.configure(bg="#e0f2fe")
+        window.protocol("WM_DELETE_WINDOW", window.withdraw)
+        window.bind("<Escape>", lambda event: window.withdraw())
+
+        self.facts_title = tk.Label(
+            window,
+            text="",
+            font=("Helvetica", 16, "bold"),
+            bg="#6366f1",
+            fg="white",
+            padx=12,
+            pady=6
         )
+        self.facts_title.grid(row=0, column=0, columnspan=2, sticky="ew")
+
+        self.facts_values = []
+        for row, (heading, _) in enumerate(facts_rows("", ""), start=1):
+            tk.Label(
+                window,
+                text=f"{heading}:",
+                font=("Helvetica", 12, "bold"),
+                bg="#e0f2fe",
+                fg="#1e293b"
+            ).grid(row=row, column=0, sticky="w", padx=(12, 6), pady=4)
+            value = tk.Label(
+                window,
+                text="",
+                font=("Helvetica", 12),
+                bg="#e0f2fe",
+                fg="#0f172a"
+            )
+            value.grid(row=row, column=1, sticky="w", padx=(0, 12), pady=4)
+            self.facts_values.append(value)
 
-        info = (
-            f"State: {self.state}\n"
-            f"Capital: {capital}\n\n"
-            f"State Flower: {flower}\n"
-            f"State Bird: {bird}"
-        )
-        messagebox.showinfo(f"{self.state} Facts", info)
+        tk.Button(
+            window,
+            text="Close",
+            font=("Helvetica", 11),
+            command=window.withdraw
+        ).grid(row=len(self.facts_values) + 1, column=0, columnspan=2, pady=(4, 10))
+
+    def _refresh_facts_panel(self):
+        """Fill the panel for the current state (only if it is showing or being opened)."""
+        if self.facts_window is None:
+            return
+        state = self.engine.state
+        rows = facts_index.get(state)
+        if rows is None:
+            self._set(self.facts_title, text="No state selected yet!")
+            for value in self.facts_values:
+                self._set(value, text="")
+            return
+
+        # In click mode the state is the answer: until it has been answered,
+        # show its capital, flower and bird as clues but not its name
+        if self.click_mode and self.phase == PROMPTING:
+            state = "Mystery state"
+        self.facts_window.title(f"{state} Facts")
+        self._set(self.facts_title, text=f"{state} 🌸🕊️")
+        for value, (_, text) in zip(self.facts_values, rows):
+            self._set(value, text=text)
+
+    def close(self):
+        """Save the session and flush any queued answer history, then close the window."""
+        if self.session is not None:
+            try:
+                SessionState.capture(self.engine, self.revealed).save(self.session)
+            except OSError as e:
+                print(f"Could not save session: {e}")   # don't stop the window closing
+        self._cancel_advance()
+        if self.ticker is not None:
+            self.ticker.stop()
+        if self.history is not None:
+            self.history.close()
+        if self.recorder is not None:
+            try:
+                self.recorder.close()
+            except OSError as e:
+                print(f"Could not save recording: {e}")
+        self.master.destroy()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--spaced",
+        action="store_true",
+        help="use Leitner spaced repetition instead of random order"
+    )
+    parser.add_argument(
+        "--autocomplete",
+        action="store_true",
+        help="suggest capital names while typing"
+    )
+    parser.add_argument(
+        "--click",
+        action="store_true",
+        help="click mode: show a capital and click its state on the map"
+    )
+    parser.add_argument(
+        "--rapid",
+        action="store_true",
+        help="60-second speed round with no pause between questions"
+    )
+    parser.add_argument(
+        "--student",
+        help="name to file answer history under (default: login name)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="save progress on close and continue it next time"
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="don't save answer history"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="seed for the question order (default: a fresh one each run)"
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="record every input to FILE for headless replay (see replay.py)"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="record Tk callback timings to a Chrome/Perfetto trace file"
+    )
+    parser.add_argument(
+        "--startup-times",
+        action="store_true",
+        help="print how long the window and the map took to appear"
+    )
+    args = parser.parse_args()
+
+    # Tracing must be switched on before any widget registers a callback
+    tracer = None
+    if args.trace:
+        tracer = TkTracer()
+        tracer.enable()
+
     root = tk.Tk()
-    quiz = StateCapitalQuiz(root)
+    history = None if args.no_history else AnswerLog(student=args.student)
+    quiz = StateCapitalQuiz(
+        root,
+        spaced=args.spaced,
+        autocomplete=args.autocomplete,
+        history=history,
+        click=args.click,
+        rapid=args.rapid,
+        session=session_path(args.student, gui=MAP) if args.resume else None,
+        seed=args.seed,
+        recorder=EventRecorder(args.record) if args.record else None,
+        startup_times=args.startup_times
+    )
     root.mainloop()
+
+    if tracer is not None:
+        tracer.disable()
+        tracer.write(args.trace)